@@ -10,6 +10,8 @@ BACK_GROUND = False
 ADDON_VERSION = (0, 0, 0)
 ADDON_ID = os.path.basename(os.path.dirname(os.path.abspath(__file__)))
 ADDON_PATH = os.path.normpath(os.path.dirname(os.path.abspath(__file__)))
+# Per-user data (logs, preset library, sync log); survives addon updates.
+USER_DATA_PATH = os.path.join(os.path.expanduser("~"), ".bone_color_presets")
 ICON_ENUM_ITEMS = bpy.types.UILayout.bl_rna.functions[
     "prop"].parameters["icon"].enum_items
 
@@ -54,7 +56,12 @@ def init_addon(
 
 
 modules = [
+    "preset_library",
+    "preset_sync",
     "bone_color_sets",
+    "diagnostics",
+    "preset_blend",
+    "preset_audit",
     "preferences",
 ]
 
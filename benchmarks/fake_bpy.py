@@ -0,0 +1,485 @@
+"""In-process stand-in for the parts of ``bpy`` used by this addon.
+
+Only what the addon touches is modelled: annotation-based properties
+on PropertyGroups, operators and AddonPreferences, collections with
+``foreach_get``/``foreach_set``, COLOR vectors with ``.hsv``, the theme's
+bone color sets and a UILayout that just counts what is drawn.
+Call ``install()`` before importing the addon.
+"""
+import colorsys
+import sys
+import types
+
+
+# ---------------------------------------------------------------------------
+# Properties
+
+class _PropDef:
+    def __init__(self, kind, **options):
+        self.kind = kind
+        self.options = options
+
+
+def BoolProperty(**options):
+    return _PropDef("BOOLEAN", **options)
+
+
+def IntProperty(**options):
+    return _PropDef("INT", **options)
+
+
+def FloatProperty(**options):
+    return _PropDef("FLOAT", **options)
+
+
+def StringProperty(**options):
+    return _PropDef("STRING", **options)
+
+
+def EnumProperty(**options):
+    return _PropDef("ENUM", **options)
+
+
+def FloatVectorProperty(**options):
+    return _PropDef("FLOAT_VECTOR", **options)
+
+
+def CollectionProperty(**options):
+    return _PropDef("COLLECTION", **options)
+
+
+def PointerProperty(**options):
+    return _PropDef("POINTER", **options)
+
+
+_DEFAULTS = {"BOOLEAN": False, "INT": 0, "FLOAT": 0.0, "STRING": ""}
+
+
+class Color:
+    """Mutable RGB triple, like ``mathutils.Color`` / a COLOR property."""
+    __slots__ = ("_values", "_min", "_max")
+
+    def __init__(self, values=(0.0, 0.0, 0.0), min=0.0, max=1.0):
+        self._min = min
+        self._max = max
+        self._values = [0.0, 0.0, 0.0]
+        self[:] = values
+
+    def __len__(self):
+        return 3
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self._values[index])
+        return self._values[index]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            values = [float(v) for v in value]
+            if len(values) != len(self._values[index]):
+                raise ValueError("bpy_prop_array[slice] = value: re-sizing bpy_struct element in arrays isn't supported")
+            self._values[index] = [min(self._max, max(self._min, v)) for v in values]
+        else:
+            self._values[index] = min(self._max, max(self._min, float(value)))
+
+    def __eq__(self, other):
+        return tuple(self._values) == tuple(other)
+
+    def __repr__(self):
+        return f"Color({tuple(self._values)})"
+
+    @property
+    def hsv(self):
+        return colorsys.rgb_to_hsv(*self._values)
+
+    @hsv.setter
+    def hsv(self, value):
+        self[:] = colorsys.hsv_to_rgb(*value)
+
+
+class Collection:
+    """``bpy_prop_collection`` of PropertyGroup items."""
+
+    def __init__(self, item_type):
+        self._type = item_type
+        self._items = []
+
+    def add(self):
+        item = self._type()
+        self._items.append(item)
+        return item
+
+    def remove(self, index):
+        del self._items[index]
+
+    def clear(self):
+        self._items.clear()
+
+    def move(self, from_index, to_index):
+        self._items.insert(to_index, self._items.pop(from_index))
+
+    def find(self, name):
+        for i, item in enumerate(self._items):
+            if getattr(item, "name", None) == name:
+                return i
+        return -1
+
+    def get(self, name, default=None):
+        index = self.find(name)
+        return self._items[index] if index >= 0 else default
+
+    def keys(self):
+        return [getattr(item, "name", "") for item in self._items]
+
+    def values(self):
+        return list(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            item = self.get(key)
+            if item is None:
+                raise KeyError(key)
+            return item
+        return self._items[key]
+
+    def _check_foreach_size(self, attr, seq):
+        # Like bpy, the flat sequence must match the collection exactly.
+        if not self._items:
+            expected = 0
+        else:
+            value = getattr(self._items[0], attr)
+            expected = len(self._items) * (len(value) if isinstance(value, Color) else 1)
+        if len(seq) != expected:
+            raise RuntimeError(
+                f"internal error setting the array: {attr} expects {expected} values, got {len(seq)}")
+
+    def foreach_get(self, attr, seq):
+        self._check_foreach_size(attr, seq)
+        i = 0
+        for item in self._items:
+            value = getattr(item, attr)
+            if isinstance(value, Color):
+                seq[i:i + 3] = value[:]
+                i += 3
+            else:
+                seq[i] = value
+                i += 1
+
+    def foreach_set(self, attr, seq):
+        self._check_foreach_size(attr, seq)
+        i = 0
+        for item in self._items:
+            value = getattr(item, attr)
+            if isinstance(value, Color):
+                value[:] = seq[i:i + 3]
+                i += 3
+            else:
+                setattr(item, attr, type(value)(seq[i]))
+                i += 1
+
+
+class _Property:
+    """Descriptor created for each annotated property."""
+
+    def __init__(self, name, prop):
+        self.name = name
+        self.kind = prop.kind
+        self.options = prop.options
+        self.update = prop.options.get("update")
+
+    def default(self):
+        options = self.options
+        if self.kind == "COLLECTION":
+            return Collection(options["type"])
+        if self.kind == "POINTER":
+            return options["type"]()
+        if self.kind == "FLOAT_VECTOR":
+            size = options.get("size", 3)
+            return Color(options.get("default", (0.0,) * size),
+                         options.get("min", -float("inf")), options.get("max", float("inf")))
+        if "default" in options:
+            return options["default"]
+        if self.kind == "ENUM":
+            items = options.get("items", ())
+            return items[0][0] if not callable(items) and items else ""
+        return _DEFAULTS[self.kind]
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        values = instance.__dict__.setdefault("_values", {})
+        if self.name not in values:
+            values[self.name] = self.default()
+        return values[self.name]
+
+    def __set__(self, instance, value):
+        if self.kind == "FLOAT_VECTOR":
+            self.__get__(instance, type(instance))[:] = value
+        elif self.kind in {"COLLECTION", "POINTER"}:
+            raise AttributeError(f"Property '{self.name}' is read-only")
+        else:
+            instance.__dict__.setdefault("_values", {})[self.name] = value
+        if self.update is not None:
+            self.update(instance, context)
+
+
+class bpy_struct:
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, prop in list(cls.__dict__.get("__annotations__", {}).items()):
+            if isinstance(prop, _PropDef):
+                setattr(cls, name, _Property(name, prop))
+
+
+class PropertyGroup(bpy_struct):
+    pass
+
+
+class Operator(bpy_struct):
+    def __init__(self):
+        self.reports = []
+
+    def report(self, type, message):
+        self.reports.append((set(type), message))
+
+
+class AddonPreferences(bpy_struct):
+    layout = None
+
+
+class Panel(bpy_struct):
+    pass
+
+
+class UIList(bpy_struct):
+    layout_type = 'DEFAULT'
+
+
+# ---------------------------------------------------------------------------
+# UI
+
+class UILayout:
+    """Records how many UI calls a draw makes instead of drawing them."""
+
+    bl_rna = types.SimpleNamespace(functions={
+        "prop": types.SimpleNamespace(parameters={
+            "icon": types.SimpleNamespace(enum_items=()),
+        }),
+    })
+
+    def __init__(self, root=None):
+        self.root = root or self
+        self.calls = 0
+        self.use_property_split = False
+        self.alignment = 'EXPAND'
+        self.alert = False
+        self.enabled = True
+        self.active = True
+        self.scale_y = 1.0
+
+    def _child(self, *args, **kwargs):
+        self.root.calls += 1
+        return UILayout(self.root)
+
+    box = row = column = split = _child
+
+    def _leaf(self, *args, **kwargs):
+        self.root.calls += 1
+
+    label = prop = prop_search = separator = template_list = _leaf
+
+    def operator(self, *args, **kwargs):
+        self.root.calls += 1
+        return types.SimpleNamespace()
+
+
+# ---------------------------------------------------------------------------
+# Preferences and themes
+
+BONE_COLOR_SET_COUNT = 20
+
+
+class ThemeBoneColorSet(bpy_struct):
+    normal: FloatVectorProperty(subtype='COLOR', size=3, min=0.0, max=1.0)
+    select: FloatVectorProperty(subtype='COLOR', size=3, min=0.0, max=1.0)
+    active: FloatVectorProperty(subtype='COLOR', size=3, min=0.0, max=1.0)
+    show_colored_constraints: BoolProperty()
+
+
+class Theme(bpy_struct):
+    name: StringProperty(default="Default")
+    bone_color_sets: CollectionProperty(type=ThemeBoneColorSet)
+
+    def __init__(self):
+        for i in range(BONE_COLOR_SET_COUNT):
+            item = self.bone_color_sets.add()
+            item.normal = colorsys.hsv_to_rgb(i / BONE_COLOR_SET_COUNT, 0.9, 0.6)
+            item.select = colorsys.hsv_to_rgb(i / BONE_COLOR_SET_COUNT, 0.8, 0.75)
+            item.active = colorsys.hsv_to_rgb(i / BONE_COLOR_SET_COUNT, 0.7, 0.95)
+
+
+class Addon(bpy_struct):
+    module: StringProperty()
+
+    def __init__(self):
+        self.preferences = None
+
+
+class Preferences(bpy_struct):
+    themes: CollectionProperty(type=Theme)
+    addons: CollectionProperty(type=Addon)
+
+    def __init__(self):
+        self.themes.add()
+
+
+class WindowManager:
+    windows = ()
+
+    def fileselect_add(self, operator):
+        pass
+
+    def modal_handler_add(self, operator):
+        return True
+
+    def event_timer_add(self, time_step, window=None):
+        return types.SimpleNamespace(time_step=time_step)
+
+    def event_timer_remove(self, timer):
+        pass
+
+
+class Area:
+    def tag_redraw(self):
+        pass
+
+    def header_text_set(self, text):
+        pass
+
+
+class Context:
+    def __init__(self):
+        self.preferences = Preferences()
+        self.window_manager = WindowManager()
+        self.window = None
+        self.area = Area()
+
+
+context = Context()
+
+
+# ---------------------------------------------------------------------------
+# Registration
+
+_registered = []
+
+
+def register_class(cls):
+    _registered.append(cls)
+    if issubclass(cls, AddonPreferences):
+        addon = context.preferences.addons.get(cls.bl_idname)
+        if addon is None:
+            addon = context.preferences.addons.add()
+            addon.module = cls.bl_idname
+            # Collection.find() looks items up by ``name``.
+            addon.name = cls.bl_idname
+        addon.preferences = cls()
+
+
+def unregister_class(cls):
+    _registered.remove(cls)
+    if issubclass(cls, AddonPreferences):
+        index = context.preferences.addons.find(cls.bl_idname)
+        if index >= 0:
+            context.preferences.addons.remove(index)
+
+
+def register_classes_factory(classes):
+    def register():
+        for cls in classes:
+            register_class(cls)
+
+    def unregister():
+        for cls in reversed(classes):
+            unregister_class(cls)
+
+    return register, unregister
+
+
+class _Timers:
+    def __init__(self):
+        self._functions = {}
+
+    def register(self, function, first_interval=0.0, persistent=False):
+        self._functions[function] = first_interval
+
+    def unregister(self, function):
+        self._functions.pop(function, None)
+
+    def is_registered(self, function):
+        return function in self._functions
+
+    def run_once(self):
+        """Call every registered timer once, honouring their return values."""
+        for function in list(self._functions):
+            interval = function()
+            if interval is None:
+                self.unregister(function)
+
+
+def install():
+    """Publish the fake as ``bpy``, its submodules and ``bl_ui``."""
+    global bpy
+    bpy = types.ModuleType("bpy")
+    bpy.context = context
+
+    bpy.types = types.ModuleType("bpy.types")
+    for cls in (bpy_struct, PropertyGroup, Operator, AddonPreferences, Panel, UIList, UILayout):
+        setattr(bpy.types, cls.__name__, cls)
+
+    bpy.props = types.ModuleType("bpy.props")
+    for func in (BoolProperty, IntProperty, FloatProperty, StringProperty, EnumProperty,
+                 FloatVectorProperty, CollectionProperty, PointerProperty):
+        setattr(bpy.props, func.__name__, func)
+
+    bpy.utils = types.ModuleType("bpy.utils")
+    bpy.utils.register_class = register_class
+    bpy.utils.unregister_class = unregister_class
+    bpy.utils.register_classes_factory = register_classes_factory
+
+    bpy.path = types.SimpleNamespace(abspath=lambda path: path)
+
+    bpy.app = types.SimpleNamespace(
+        version=(4, 1, 0), background=False, timers=_Timers())
+
+    bl_ui = types.ModuleType("bl_ui")
+    space_userpref = types.ModuleType("bl_ui.space_userpref")
+
+    class USERPREF_PT_theme_bone_color_sets(Panel):
+        def draw_centered(self, context, layout):
+            pass
+
+    space_userpref.USERPREF_PT_theme_bone_color_sets = USERPREF_PT_theme_bone_color_sets
+    bl_ui.space_userpref = space_userpref
+
+    sys.modules.update({
+        "bpy": bpy,
+        "bpy.types": bpy.types,
+        "bpy.props": bpy.props,
+        "bpy.utils": bpy.utils,
+        "bl_ui": bl_ui,
+        "bl_ui.space_userpref": space_userpref,
+    })
+    return bpy
+
+
+bpy = None
@@ -0,0 +1,266 @@
+"""Headless benchmarks for the preset pipeline.
+
+Runs the addon against ``fake_bpy`` outside Blender and times the
+preset operators at several library sizes. Results are written as
+JSON and compared with the stored baseline: cases whose median got
+slower than ``--threshold`` times the baseline are reported and the
+exit status is 1. A missing baseline is an error (exit status 2);
+create one with ``--update-baseline`` on the reference machine.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --scales 1 100 --update-baseline
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+from time import perf_counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ADDON_DIR = os.path.dirname(BENCH_DIR)
+
+sys.path.insert(0, BENCH_DIR)
+import fake_bpy  # noqa: E402
+
+
+DEFAULT_SCALES = (1, 100, 10000)
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+
+def load_addon():
+    """Import and register the addon package on top of fake_bpy."""
+    bpy = fake_bpy.install()
+    name = os.path.basename(ADDON_DIR)
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(ADDON_DIR, "__init__.py"),
+        submodule_search_locations=[ADDON_DIR])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[name] = package
+    spec.loader.exec_module(package)
+    package.register()
+
+    addon = sys.modules[f"{name}.addon"]
+    pr = addon.prefs(bpy.context)
+    # Keep the benchmarks free of console and log file I/O.
+    pr.use_log_sink = False
+    pr.use_log_console = False
+    return bpy, package
+
+
+def timeit(func, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+    return {
+        "runs": repeat,
+        "median": statistics.median(times),
+        "min": min(times),
+        "max": max(times),
+    }
+
+
+class Suite:
+    def __init__(self, bpy, package, repeat, tmpdir):
+        self.bpy = bpy
+        self.context = bpy.context
+        self.repeat = repeat
+        self.tmpdir = tmpdir
+        self.name = package.__name__
+        self.sets = sys.modules[f"{self.name}.bone_color_sets"]
+        self.preferences = sys.modules[f"{self.name}.preferences"]
+        self.addon = sys.modules[f"{self.name}.addon"]
+        self.results = {}
+
+    @property
+    def prefs(self):
+        return self.addon.prefs(self.context)
+
+    @property
+    def theme(self):
+        return self.context.preferences.themes[0]
+
+    def fill_library(self, size):
+        pr = self.prefs
+        pr.bcs_presets.clear()
+        for _ in range(size):
+            pr.bcs_presets.add().add_color_sets(self.theme)
+        pr.active_bcs_preset_index = size - 1
+
+    def operator(self, cls, **props):
+        op = cls()
+        for key, value in props.items():
+            setattr(op, key, value)
+        return op
+
+    def record(self, case, size, result):
+        self.results[f"{case}[{size}]"] = result
+
+    def run(self, sizes):
+        for size in sizes:
+            self.fill_library(size)
+            for name in sorted(dir(self)):
+                if name.startswith("bench_"):
+                    case = name[len("bench_"):]
+                    self.record(case, size, getattr(self, name)(size))
+        return self.results
+
+    # --- Cases ---
+
+    def bench_save_preset(self, size):
+        pr = self.prefs
+        op = self.operator(self.sets.BONECOLOR_OT_save_preset)
+
+        def trim():
+            while len(pr.bcs_presets) > size:
+                pr.bcs_presets.remove(len(pr.bcs_presets) - 1)
+        result = timeit(lambda: op.execute(self.context), self.repeat, trim)
+        trim()
+        pr.active_bcs_preset_index = size - 1
+        return result
+
+    def bench_load_preset(self, size):
+        op = self.operator(self.sets.BONECOLOR_OT_load_preset)
+        return timeit(lambda: op.execute(self.context), self.repeat)
+
+    def bench_restore_color_sets(self, size):
+        pr = self.prefs
+        preset = pr.bcs_presets[pr.active_bcs_preset_index]
+        return timeit(lambda: preset.restore_color_sets(self.theme), self.repeat)
+
+    def bench_export_preset(self, size):
+        op = self.operator(
+            self.sets.EXPORT_OT_bone_color_preset,
+            filepath=os.path.join(self.tmpdir, "export.json"))
+        return timeit(lambda: op.execute(self.context), self.repeat)
+
+    def bench_import_preset(self, size):
+        pr = self.prefs
+        filepath = os.path.join(self.tmpdir, "import.json")
+        self.operator(self.sets.EXPORT_OT_bone_color_preset, filepath=filepath).execute(self.context)
+        op = self.operator(self.sets.IMPORT_OT_bone_color_preset, filepath=filepath)
+
+        def trim():
+            while len(pr.bcs_presets) > size:
+                pr.bcs_presets.remove(len(pr.bcs_presets) - 1)
+        result = timeit(lambda: op.execute(self.context), self.repeat, trim)
+        trim()
+        return result
+
+    def bench_edit_value(self, size):
+        self.preferences.BoneColorSetsEditor.set_all_selected(True)
+        op = self.operator(
+            self.preferences.BONECOLOR_OT_EditValue,
+            target_color="SELECT", target_value="HUE", direction="UP")
+        result = timeit(lambda: op.execute(self.context), self.repeat)
+        self.preferences.BoneColorSetsEditor.set_all_selected(False)
+        return result
+
+    def bench_blend_frame(self, size):
+        blend = sys.modules[f"{self.name}.preset_blend"]
+        pr = self.prefs
+        source = pr.bcs_presets[0]
+        target = pr.bcs_presets[pr.active_bcs_preset_index]
+        op = self.operator(
+            blend.BONECOLOR_OT_blend_presets,
+            source_index=0, target_index=pr.active_bcs_preset_index, factor=0.3)
+        preset_blend = blend.PresetBlend(source, target, "OKLAB")
+        return timeit(lambda: op._apply(self.context, preset_blend), self.repeat)
+
+    def userpref_roundtrip(self):
+        """Stand-in for writing and reading userpref.blend: serialize
+        every preset held in the preferences collection."""
+        data = json.dumps([
+            {"name": p.name, "color_sets": [cs.as_dict() for cs in p.color_sets]}
+            for p in self.prefs.bcs_presets])
+        json.loads(data)
+
+    def bench_userpref_save(self, size):
+        return timeit(self.userpref_roundtrip, self.repeat)
+
+    def bench_userpref_save_store(self, size):
+        """Same round trip with the SQLite library holding the presets."""
+        pr = self.prefs
+        pr.preset_store_path = os.path.join(self.tmpdir, f"library_{size}.sqlite")
+        pr.use_preset_store = True
+        result = timeit(self.userpref_roundtrip, self.repeat)
+        result["materialized"] = len(pr.bcs_presets)
+
+        pr.use_preset_store = False
+        self.fill_library(size)
+        return result
+
+    def bench_draw_presets(self, size):
+        ui = self.preferences.bone_color_presets_ui
+        return timeit(
+            lambda: ui.draw_presets(self.context, fake_bpy.UILayout()), self.repeat)
+
+
+def compare(results, baseline, threshold):
+    """Return (case, baseline, current) for every regressed case."""
+    regressions = []
+    for case, result in results.items():
+        base = baseline.get(case)
+        if base is not None and result["median"] > base["median"] * threshold:
+            regressions.append((case, base["median"], result["median"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help="library sizes to benchmark")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="slowdown factor counted as a regression")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    bpy, package = load_addon()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        results = Suite(bpy, package, args.repeat, tmpdir).run(args.scales)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scales": list(args.scales),
+        "results": results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=4)
+
+    for case, result in results.items():
+        print(f"{case:<32} median {result['median'] * 1e3:10.3f} ms  min {result['min'] * 1e3:10.3f} ms")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=4)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one",
+              file=sys.stderr)
+        return 2
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    for case, base, current in regressions:
+        print(f"REGRESSION {case}: {base * 1e3:.3f} ms -> {current * 1e3:.3f} ms")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Stress test for syncing presets between instances.
+
+Starts several local processes, each running the addon on top of
+``fake_bpy`` against one shared change log. They save, remove and
+rename presets concurrently while tailing the log, with a small log
+size so compaction runs many times. Every save starts out named
+"Preset 1", and each process also saves a few presets before it enables
+syncing. Afterwards every process must hold the same presets, and every
+preset saved and never removed must still exist; the exit status is 1
+otherwise.
+
+    python benchmarks/sync_stress.py
+    python benchmarks/sync_stress.py --processes 8 --ops 500 --store
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+from time import perf_counter
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, BENCH_DIR)
+
+
+NAMES = [f"Shared {i}" for i in range(8)]
+
+
+def worker(index, args, sync_dir, barrier, results):
+    from run_benchmarks import load_addon
+
+    bpy, package = load_addon()
+    name = package.__name__
+    addon = sys.modules[f"{name}.addon"]
+    sets = sys.modules[f"{name}.bone_color_sets"]
+    sync = sys.modules[f"{name}.preset_sync"]
+    change_log = sys.modules[f"{name}.change_log"]
+
+    context = bpy.context
+    pr = addon.prefs(context)
+    theme = context.preferences.themes[0]
+    if args.store:
+        pr.preset_store_path = os.path.join(sync_dir, f"library_{index}.sqlite")
+        pr.use_preset_store = True
+    pr.sync_directory = sync_dir
+    sync._log = change_log.ChangeLog(sync_dir, max_bytes=args.max_bytes)
+
+    rng = random.Random(args.seed + index)
+    save = sets.BONECOLOR_OT_save_preset()
+    remove = sets.BONECOLOR_OT_remove_preset()
+    saved = []
+    removed = []
+
+    def save_random():
+        for theme_set in theme.bone_color_sets:
+            theme_set.normal = (rng.random(), rng.random(), rng.random())
+        save.execute(context)
+        saved.append(pr.bcs_presets[pr.active_bcs_preset_index].sync_id)
+
+    # Saved while syncing is off, under names the other processes use too.
+    for _ in range(args.local):
+        save_random()
+    barrier.wait()
+    pr.use_sync = True
+    applied = 0
+    barrier.wait()
+
+    start = perf_counter()
+    for _ in range(args.ops):
+        op = rng.random()
+        presets = pr.bcs_presets
+        if op < 0.5 or not len(presets):
+            save_random()
+        elif op < 0.75:
+            pr.active_bcs_preset_index = rng.randrange(len(presets))
+            removed.append(presets[pr.active_bcs_preset_index].sync_id)
+            remove.execute(context)
+            pr.active_bcs_preset_index = len(pr.bcs_presets) - 1
+        else:
+            presets[rng.randrange(len(presets))].name = rng.choice(NAMES)
+        if rng.random() < 0.3:
+            applied += sync.apply_changes(pr)
+    elapsed = perf_counter() - start
+
+    # Drain what the others appended before comparing.
+    barrier.wait()
+    applied += sync.apply_changes(pr)
+
+    # Presets by sync id. Values are compared at single precision:
+    # library rows hold either record values or ones read from a preset.
+    if args.store:
+        # Library names may carry a local suffix, so only colors count.
+        store = sys.modules[f"{name}.preset_library"].get_store(pr)
+        entries = [(sync_id, None, sync.encode_stored_sets(color_sets))
+                   for _, sync_id, color_sets in store.items()]
+    else:
+        entries = [(p.sync_id, p.name, sync.encode_color_sets(p)) for p in pr.bcs_presets]
+    state = {sync_id: (preset_name, np.float32(values).round(5).tolist())
+             for sync_id, preset_name, values in entries}
+    results[index] = {
+        "state": state, "duplicates": len(entries) - len(state),
+        "saved": saved, "removed": removed, "applied": applied, "elapsed": elapsed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=300)
+    parser.add_argument("--max-bytes", type=int, default=64 * 1024,
+                        help="Log size that triggers compaction")
+    parser.add_argument("--store", action="store_true",
+                        help="Keep presets in a SQLite library per process")
+    parser.add_argument("--local", type=int, default=3,
+                        help="Presets each process saves before enabling syncing")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as sync_dir:
+        manager = multiprocessing.Manager()
+        results = manager.dict()
+        barrier = manager.Barrier(args.processes)
+        processes = [
+            multiprocessing.Process(target=worker, args=(i, args, sync_dir, barrier, results))
+            for i in range(args.processes)]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+        results = dict(results)
+
+    if len(results) != args.processes:
+        print(f"{args.processes - len(results)} processes failed")
+        return 1
+
+    for i, result in sorted(results.items()):
+        print(f"process {i}: {len(result['state'])} presets, "
+              f"applied {result['applied']} records, {result['elapsed']:.2f}s")
+
+    states = [result["state"] for result in results.values()]
+    if any(state != states[0] for state in states[1:]):
+        print("FAILED: processes ended with different presets")
+        return 1
+    if any(result["duplicates"] for result in results.values()):
+        print("FAILED: a preset exists more than once")
+        return 1
+    saved = {i for result in results.values() for i in result["saved"]}
+    removed = {i for result in results.values() for i in result["removed"]}
+    # A rename replayed after a removal may bring a removed preset back,
+    # but a preset nobody removed must never go missing.
+    lost = saved - removed - set(states[0])
+    if lost or not set(states[0]) <= saved:
+        print(f"FAILED: {len(lost)} saved presets were lost")
+        return 1
+    print("OK: all processes converged")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
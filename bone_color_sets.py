@@ -8,10 +8,52 @@ from bpy.props import (
     CollectionProperty,
 )
 
-from . addon import prefs, uprefs, ADDON_ID, ADDON_VERSION, ADDON_PATH
+from . addon import prefs, uprefs, ADDON_VERSION, ADDON_PATH
 from . debug_utils import Log, DBG_OPS, DBG_JSON
+from . profiler import profiler
+from . metrics import metrics
+from . preset_library import (
+    active_name,
+    forget_preset,
+    store_preset,
+    touch_preset,
+    update_name,
+    update_pinned,
+)
+from . preset_schema import (
+    RELEASE_ADDON_ID,
+    PresetError,
+    decode_preset,
+    dump_file,
+    encode_preset,
+    load_file,
+    normalize_color_set,
+    parse_version,
+    source_version,
+    upgrade,
+)
 
 import json
+import numpy as np
+
+
+COLOR_STATES = ("normal", "select", "active")
+
+
+def color_sets_to_array(color_sets):
+    """Read a collection of color sets into a (sets, states, rgb) array."""
+    count = len(color_sets)
+    array = np.empty((len(COLOR_STATES), count * 3), dtype=np.float32)
+    for i, state in enumerate(COLOR_STATES):
+        color_sets.foreach_get(state, array[i])
+    return array.reshape(len(COLOR_STATES), count, 3).transpose(1, 0, 2)
+
+
+def array_to_color_sets(color_sets, array):
+    """Bulk write a (sets, states, rgb) array into a collection of color sets."""
+    for i, state in enumerate(COLOR_STATES):
+        color_sets.foreach_set(
+            state, np.ascontiguousarray(array[:, i, :], dtype=np.float32).ravel())
 
 
 class BCSPresetItem(PropertyGroup):
@@ -65,15 +107,25 @@ class BCSPresetItem(PropertyGroup):
         }
     
     def from_dict(self, data):
-        self.normal = data["normal"]
-        self.select = data["select"]
-        self.active = data["active"]
-        self.show_colored_constraints = data["show_colored_constraints"]
+        """Assign the fields present in ``data``; missing ones keep their value."""
+        for key in ("normal", "select", "active", "show_colored_constraints"):
+            if key in data:
+                setattr(self, key, data[key])
 
 
 class BCSPresets(PropertyGroup):
     color_sets: CollectionProperty(type=BCSPresetItem)
-    name: StringProperty(default="Custom Bone Color Sets")
+    name: StringProperty(default="Custom Bone Color Sets", update=update_name)
+    # Key of this preset in the SQLite library, empty until stored.
+    stored_name: StringProperty(options={'HIDDEN'})
+    # Key of this preset in sync records, assigned when first saved.
+    sync_id: StringProperty(options={'HIDDEN'})
+    pinned: BoolProperty(
+        name="Pinned",
+        description="Keep this preset in the preferences when using the preset library",
+        default=False,
+        update=update_pinned,
+    )
 
     def add_color_sets(self, theme):
         """Add a new color set preset and initialize it from the given theme."""
@@ -88,6 +140,17 @@ class BCSPresets(PropertyGroup):
         for theme_set, preset_set in zip(theme.bone_color_sets, self.color_sets):
             preset_set.copy_to(theme_set)
 
+    def to_array(self):
+        return color_sets_to_array(self.color_sets)
+
+    def set_from_array(self, array, show_colored_constraints=()):
+        """Fill an empty preset from a (sets, states, rgb) array."""
+        flags = list(show_colored_constraints) or [False] * len(array)
+        for flag in flags:
+            self.color_sets.add().show_colored_constraints = flag
+        array_to_color_sets(self.color_sets, array)
+        return self
+
     def save_to_file(self, filepath):
         """Save presets to a file."""
         import json
@@ -100,11 +163,12 @@ class BCSPresets(PropertyGroup):
         import json
         with open(filepath, 'r') as f:
             data = json.load(f)
-        for cs_data in data:
+        for i, cs_data in enumerate(data):
             cs = self.color_sets.add()
-            cs.from_dict(cs_data)
+            cs.from_dict(normalize_color_set(cs_data, i))
 
 
+@metrics.instrument_operator
 class BONECOLOR_OT_save_preset(Operator):
     """Save the current bone color settings as a new preset"""
     bl_idname = "bonecolor.save_preset"
@@ -116,6 +180,7 @@ class BONECOLOR_OT_save_preset(Operator):
         theme = uprefs(context).themes[0]
         return hasattr(theme, "bone_color_sets")
 
+    @profiler.profile()
     def execute(self, context):
         try:
             return self.save_preset(context)
@@ -132,11 +197,15 @@ class BONECOLOR_OT_save_preset(Operator):
         new_preset.add_color_sets(theme)
 
         pr.active_bcs_preset_index = len(pr.bcs_presets) - 1
+        if not store_preset(pr, new_preset):
+            self.report({'INFO'}, f"Bone color preset already in the library: {active_name(pr)}")
+            return {'FINISHED'}
 
         self.report({'INFO'}, f"New bone color preset saved: {new_preset.name}")
         return {'FINISHED'}
 
 
+@metrics.instrument_operator
 class BONECOLOR_OT_load_preset(Operator):
     """Load the selected bone color preset"""
     bl_idname = "bonecolor.load_preset"
@@ -148,6 +217,7 @@ class BONECOLOR_OT_load_preset(Operator):
         pr = prefs(context)
         return pr.active_bcs_preset_index >= 0
 
+    @profiler.profile()
     def execute(self, context):
         try:
             return self.load_preset(context)
@@ -162,11 +232,13 @@ class BONECOLOR_OT_load_preset(Operator):
 
         source_preset = pr.bcs_presets[pr.active_bcs_preset_index]
         source_preset.restore_color_sets(theme)
+        touch_preset(pr, source_preset)
 
         self.report({'INFO'}, f"Loaded bone color preset: {source_preset.name}")
         return {'FINISHED'}
     
 
+@metrics.instrument_operator
 class BONECOLOR_OT_remove_preset(Operator):
     """Remove the selected bone color preset"""
     bl_idname = "bonecolor.remove_preset"
@@ -178,6 +250,7 @@ class BONECOLOR_OT_remove_preset(Operator):
         pr = prefs(context)
         return pr.active_bcs_preset_index >= 0
 
+    @profiler.profile()
     def execute(self, context):
         try:
             return self.remove_preset(context)
@@ -188,10 +261,13 @@ class BONECOLOR_OT_remove_preset(Operator):
     def remove_preset(self, context):
         pr = prefs(context)
         
+        forget_preset(pr, pr.bcs_presets[pr.active_bcs_preset_index])
         pr.bcs_presets.remove(pr.active_bcs_preset_index)
+        return {'FINISHED'}
     
 import os
 
+@metrics.instrument_operator
 class EXPORT_OT_bone_color_preset(Operator):
     """Export bone color presets to a file"""
     bl_idname = "bonecolor.export_preset"
@@ -204,19 +280,16 @@ class EXPORT_OT_bone_color_preset(Operator):
     )
     filter_glob: StringProperty(default="*.json", options={'HIDDEN'})
 
+    @profiler.profile()
     def execute(self, context):
         pr = prefs(context)
         target_preset = pr.bcs_presets[pr.active_bcs_preset_index]
 
-        data = {
-            "addon": ADDON_ID,
-            "version": f"{ADDON_VERSION[0]}.{ADDON_VERSION[1]}.{ADDON_VERSION[2]}",
-            "name": target_preset.name,
-            "presets": [cs.as_dict() for cs in target_preset.color_sets]
-        }
-
-        with open(self.filepath, 'w') as f:
-            json.dump(data, f, indent=4)
+        data = encode_preset(
+            target_preset.name,
+            [cs.as_dict() for cs in target_preset.color_sets],
+            ADDON_VERSION, RELEASE_ADDON_ID)
+        dump_file(self.filepath, data)
 
         self.report({'INFO'}, f"Exported bone color presets to {self.filepath}")
         return {'FINISHED'}
@@ -232,6 +305,7 @@ class EXPORT_OT_bone_color_preset(Operator):
         return {'RUNNING_MODAL'}
 
 
+@metrics.instrument_operator
 class IMPORT_OT_bone_color_preset(Operator):
     """Import bone color presets from a file"""
     bl_idname = "bonecolor.import_preset"
@@ -244,26 +318,30 @@ class IMPORT_OT_bone_color_preset(Operator):
     )
     filter_glob: StringProperty(default="*.json", options={'HIDDEN'})
 
+    @profiler.profile()
     def execute(self, context):
-        with open(self.filepath, 'r') as f:
-            data = json.load(f)
-
-        if "addon" not in data or data["addon"] != ADDON_ID:
-            self.report({'ERROR'}, "Invalid bone color preset file")
+        try:
+            data = load_file(self.filepath)
+            version = source_version(data)
+            data = upgrade(
+                data, os.path.splitext(os.path.basename(self.filepath))[0], RELEASE_ADDON_ID, ADDON_VERSION)
+            name, color_sets = decode_preset(data, RELEASE_ADDON_ID)
+        except (OSError, PresetError) as e:
+            self.report({'ERROR'}, f"Invalid bone color preset file: {e}")
             return {'CANCELLED'}
 
-        if "version" not in data or data["version"] != f"{ADDON_VERSION[0]}.{ADDON_VERSION[1]}.{ADDON_VERSION[2]}":
-            self.report({'WARNING'}, "Incompatible bone color preset version")
-            # Implement handling for future versions here
-            # e.g., if file_version > (1, 0, 0): handle new data format
+        if parse_version(version) > tuple(ADDON_VERSION):
+            self.report({'WARNING'}, f"Bone color preset version {version} is newer than this addon")
 
         pr = prefs(context)
         target_preset = pr.bcs_presets.add()
-        target_preset.name = data["name"]
-        for cs_data in data["presets"]:
+        target_preset.name = name
+        for cs_data in color_sets:
             cs = target_preset.color_sets.add()
             cs.from_dict(cs_data)
-
+        if not store_preset(pr, target_preset):
+            self.report({'INFO'}, f"Bone color preset already in the library: {active_name(pr)}")
+            return {'FINISHED'}
 
         self.report({'INFO'}, f"Imported bone color presets from {self.filepath}")
         return {'FINISHED'}
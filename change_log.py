@@ -0,0 +1,194 @@
+"""Shared append-only change log for syncing preset libraries.
+
+Several Blender instances append small JSON-line records to one file in
+a shared directory and tail it from a timer. Appends and compaction are
+serialized with an exclusive lock on a separate lock file; readers do
+not lock and only ever consume complete lines past their last offset.
+
+Records are keyed by a per-preset id, never by the display name, so
+presets that happen to share a name stay apart. Every record assigns
+the whole state of its preset (a rename is a save under the new name),
+so applying a record is idempotent and instances that replay the log in
+order end up with the same presets.
+
+Compaction rewrites the log to the last record per preset id and
+starts a new generation. Readers notice the new generation from the
+file header and replay the compacted log from the start.
+"""
+import json
+import os
+import socket
+import uuid
+from contextlib import contextmanager
+from time import time
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+LOG_NAME = "changes.jsonl"
+LOCK_NAME = "changes.lock"
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive inter-process lock held for the duration of the block."""
+    with open(path, "a+b") as f:
+        if os.name == "nt":
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after ~10 seconds; keep waiting.
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def fold(records, now=None, tombstone_ttl=7 * 24 * 3600):
+    """Reduce records to the last one per preset id.
+
+    Removals are kept as tombstones for ``tombstone_ttl`` seconds so
+    that instances which were offline still drop the preset.
+    """
+    now = time() if now is None else now
+    state = {}
+    for record in records:
+        state.pop(record["id"], None)
+        state[record["id"]] = record
+    # Dicts keep insertion order, and re-inserting moves an id to the
+    # end, so this is the order of each id's last record in the log.
+    return [
+        r for r in state.values()
+        if r["op"] != "remove" or now - r["ts"] < tombstone_ttl
+    ]
+
+
+class ChangeLog:
+    """Writer and tailer of the shared log in ``directory``."""
+
+    def __init__(self, directory, origin=None, max_bytes=256 * 1024):
+        self.directory = directory
+        self.path = os.path.join(directory, LOG_NAME)
+        self.lock_path = os.path.join(directory, LOCK_NAME)
+        self.origin = origin or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.max_bytes = max_bytes
+        self.generation = None
+        self.offset = 0
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    def _header(self, base_size=0):
+        # ``base_size`` is the size of the records kept by the last compaction.
+        return (json.dumps({"generation": uuid.uuid4().hex, "base_size": base_size}) + "\n").encode("utf-8")
+
+    def _ensure_log(self):
+        if not os.path.exists(self.path):
+            with open(self.path, "wb") as f:
+                f.write(self._header())
+
+    def record(self, op, id, **fields):
+        record = {"op": op, "id": id, "origin": self.origin, "ts": time()}
+        record.update(fields)
+        return record
+
+    def append(self, op, id, **fields):
+        """Append one record; compacts the log when it grows too large."""
+        record = self.record(op, id, **fields)
+        self.append_many([record])
+        return record
+
+    def append_many(self, records):
+        """Append records under a single lock and write."""
+        data = b"".join(
+            (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+            for record in records)
+        with file_lock(self.lock_path):
+            self._ensure_log()
+            with open(self.path, "ab") as f:
+                f.write(data)
+                size = f.tell()
+            if size > self.max_bytes and size > 2 * self._base_size():
+                # Compacting only once the log doubled keeps appends amortized
+                # O(1) even when the live presets alone exceed max_bytes.
+                self._compact()
+
+    def read_all(self):
+        """Every complete record currently in the log; leaves the
+        ``read_new`` position alone."""
+        try:
+            with open(self.path, "rb") as f:
+                f.readline()
+                return [json.loads(line) for line in f if line.endswith(b"\n")]
+        except FileNotFoundError:
+            return []
+
+    def compact(self):
+        with file_lock(self.lock_path):
+            self._ensure_log()
+            self._compact()
+
+    def _base_size(self):
+        with open(self.path, "rb") as f:
+            return json.loads(f.readline()).get("base_size", 0)
+
+    def _compact(self):
+        # Caller holds the lock.
+        records = self.read_all()
+        body = b"".join(
+            (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+            for record in fold(records))
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self._header(len(body)))
+            f.write(body)
+        try:
+            os.replace(tmp, self.path)
+        except PermissionError:
+            # On Windows a reader may have the log open; retry on a later append.
+            os.remove(tmp)
+
+    def read_new(self):
+        """Return the complete records appended since the last call.
+
+        When nothing changed this costs a single ``os.stat``.
+        """
+        try:
+            size = os.stat(self.path).st_size
+        except FileNotFoundError:
+            return []
+        if size == self.offset and self.generation is not None:
+            return []
+
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return []
+        with f:
+            header = f.readline()
+            if not header.endswith(b"\n"):
+                return []
+            generation = json.loads(header)["generation"]
+            if generation != self.generation or size < self.offset:
+                # New or compacted log: replay it from the start.
+                self.generation = generation
+                self.offset = f.tell()
+            f.seek(self.offset)
+            data = f.read()
+
+        end = data.rfind(b"\n") + 1
+        self.offset += end
+        return [json.loads(line) for line in data[:end].splitlines() if line]
@@ -0,0 +1,98 @@
+"""Vectorized color conversions on ``(..., 3)`` float arrays.
+
+Theme colors are display-referred sRGB in 0..1.
+"""
+import numpy as np
+
+
+def srgb_to_linear(rgb):
+    rgb = np.asarray(rgb, dtype=np.float64)
+    return np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+
+
+def linear_to_srgb(lin):
+    lin = np.clip(np.asarray(lin, dtype=np.float64), 0.0, None)
+    return np.where(lin <= 0.0031308, lin * 12.92, 1.055 * lin ** (1.0 / 2.4) - 0.055)
+
+
+_LMS_FROM_LINEAR = np.array([
+    [0.4122214708, 0.5363325363, 0.0514459929],
+    [0.2119034982, 0.6806995451, 0.1073969566],
+    [0.0883024619, 0.2817188376, 0.6299787005],
+])
+_OKLAB_FROM_LMS = np.array([
+    [0.2104542553, 0.7936177850, -0.0040720468],
+    [1.9779984951, -2.4285922050, 0.4505937099],
+    [0.0259040371, 0.7827717662, -0.8086757660],
+])
+_LMS_FROM_OKLAB = np.linalg.inv(_OKLAB_FROM_LMS)
+_LINEAR_FROM_LMS = np.linalg.inv(_LMS_FROM_LINEAR)
+
+
+def linear_to_oklab(lin):
+    lms = np.asarray(lin, dtype=np.float64) @ _LMS_FROM_LINEAR.T
+    return np.cbrt(lms) @ _OKLAB_FROM_LMS.T
+
+
+def oklab_to_linear(lab):
+    lms = (np.asarray(lab, dtype=np.float64) @ _LMS_FROM_OKLAB.T) ** 3
+    return lms @ _LINEAR_FROM_LMS.T
+
+
+_XYZ_FROM_LINEAR = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+_D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+_LAB_EPSILON = (6.0 / 29.0) ** 3
+
+
+def linear_to_lab(lin):
+    """CIELAB (D65) from linear sRGB."""
+    t = (np.asarray(lin, dtype=np.float64) @ _XYZ_FROM_LINEAR.T) / _D65_WHITE
+    f = np.where(t > _LAB_EPSILON, np.cbrt(t), t / (3.0 * (6.0 / 29.0) ** 2) + 4.0 / 29.0)
+    return np.stack((
+        116.0 * f[..., 1] - 16.0,
+        500.0 * (f[..., 0] - f[..., 1]),
+        200.0 * (f[..., 1] - f[..., 2]),
+    ), axis=-1)
+
+
+def srgb_to_lab(rgb):
+    return linear_to_lab(srgb_to_linear(rgb))
+
+
+def relative_luminance(rgb):
+    """WCAG relative luminance of sRGB colors."""
+    return srgb_to_linear(rgb) @ _XYZ_FROM_LINEAR[1]
+
+
+def contrast_ratio(lum_a, lum_b):
+    """WCAG contrast ratio (1..21) between two luminances."""
+    return (np.maximum(lum_a, lum_b) + 0.05) / (np.minimum(lum_a, lum_b) + 0.05)
+
+
+def delta_e(lab_a, lab_b):
+    """CIE76 color difference."""
+    return np.linalg.norm(np.asarray(lab_a) - np.asarray(lab_b), axis=-1)
+
+
+# Interpolation spaces: identifier -> (from sRGB, to sRGB).
+SPACES = {
+    "RGB": (lambda rgb: np.asarray(rgb, dtype=np.float64), lambda rgb: rgb),
+    "LINEAR": (srgb_to_linear, linear_to_srgb),
+    "OKLAB": (
+        lambda rgb: linear_to_oklab(srgb_to_linear(rgb)),
+        lambda lab: linear_to_srgb(oklab_to_linear(lab)),
+    ),
+}
+
+
+def to_space(rgb, space):
+    return SPACES[space][0](rgb)
+
+
+def from_space(values, space):
+    """Convert back to sRGB, clipped to the displayable 0..1 range."""
+    return np.clip(SPACES[space][1](values), 0.0, 1.0)
@@ -1,12 +1,31 @@
-import inspect
-import traceback
-from time import time
+import sys
+from time import perf_counter
 
 
-DBG_INIT = True
-DBG_OPS = True
-DBG_JSON = True
-DBG_PREFS = True
+class DebugFlag:
+    """Runtime switch for a debug category.
+
+    Modules import the flag object itself, so toggling ``enabled``
+    is seen everywhere without re-importing. A disabled guard such as
+    ``DBG_OPS and Log.info(...)`` costs a single truth test.
+    """
+    __slots__ = ("name", "enabled")
+
+    def __init__(self, name, enabled=False):
+        self.name = name
+        self.enabled = enabled
+
+    def __bool__(self):
+        return self.enabled
+
+    def __repr__(self):
+        return f"{self.name}={self.enabled}"
+
+
+DBG_INIT = DebugFlag("DBG_INIT")
+DBG_OPS = DebugFlag("DBG_OPS")
+DBG_JSON = DebugFlag("DBG_JSON")
+DBG_PREFS = DebugFlag("DBG_PREFS")
 
 
 
@@ -15,36 +34,69 @@ def _collect_debug_flags():
     return [name for name in globals() if name.startswith("DBG")]
 
 
+def debug_flags():
+    """Return all debug flags as a {name: DebugFlag} dict."""
+    return {name: globals()[name] for name in _collect_debug_flags()}
+
+
+def set_debug_flag(name, value):
+    """Enable or disable a debug flag by name at runtime."""
+    flag = globals().get(name)
+    if not isinstance(flag, DebugFlag):
+        raise KeyError(f"Unknown debug flag: {name}")
+    flag.enabled = bool(value)
+
+
 __all__ = _collect_debug_flags()
 __all__.append("Caller")
+__all__.append("Lazy")
 __all__.append("Log")
 __all__.append("debug_timer")
 
 
+class Lazy:
+    """Log argument computed only when the message is emitted,
+    e.g. ``Log.debug(Lazy(lambda: expensive()))``."""
+    __slots__ = ("func",)
+
+    def __init__(self, func):
+        self.func = func
+
+    def __str__(self):
+        return str(self.func())
+
+
 class Caller:
 
     @staticmethod
     def report_log_position(func):
         """Decorator to report the position of the caller in the log message."""
         def report_log_position(Log, *args, **kwargs):
-
-            frame = traceback.extract_stack()[-2]
-            module_name = frame.filename.split('\\')[-1]
-            info = f"{module_name.ljust(10)} line {str(frame.lineno).ljust(4)} in {frame.name.ljust(10)}"
+            info = Caller.format_caller_info(Caller.get_caller_info(depth=1))
             func(Log, info, *args, **kwargs)
         return report_log_position
 
     @staticmethod
-    def get_caller_info():
-        """Get the file name, line number, and function name of the caller."""
-        stack = inspect.stack()
-        # 0: get_caller_info, 1: get_caller_info, 2: caller, 3: caller's caller
-        if len(stack) < 3:
+    def get_caller_info(depth=1):
+        """Get the file name, line number, and function name of the caller.
+
+        ``depth`` counts frames above the function calling this one.
+        Uses ``sys._getframe`` so no source lines are read.
+        """
+        try:
+            frame = sys._getframe(depth + 1)
+        except ValueError:
             return None
-        
-        frame = stack[2]
-        frame_info = inspect.getframeinfo(frame[0])
-        return frame_info
+        code = frame.f_code
+        return code.co_filename, frame.f_lineno, code.co_name
+
+    @staticmethod
+    def format_caller_info(caller_info):
+        if caller_info is None:
+            return "<unknown>"
+        filename, lineno, name = caller_info
+        module_name = filename.replace('\\', '/').split('/')[-1]
+        return f"{module_name.ljust(10)} line {str(lineno).ljust(4)} in {name.ljust(10)}"
 
 
 # Logger v2
@@ -77,28 +129,80 @@ class Log:
         """Generates an ANSI escape code string from style codes."""
         return f'\033[{";".join(str(code) for code in codes)}m'
 
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+    ERROR = 40
+    LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
     LINE_LENGTH = 50
     USE_COLORS = True
+    USE_CONSOLE = True
+    level = INFO
+
+    # Optional structured sink (see log_sink.LogSink) and a callable
+    # returning the current profiler span id to attach to events.
+    sink = None
+    span_id_getter = None
+
+    @classmethod
+    def set_level(cls, level):
+        """Set the minimum level; accepts a level number or name."""
+        if isinstance(level, str):
+            level = getattr(cls, level.upper())
+        cls.level = level
+
+    @classmethod
+    def is_enabled(cls, level):
+        return level >= cls.level
+
+    @staticmethod
+    def format_message(args):
+        """Join log arguments; ``Lazy`` ones are evaluated here."""
+        return ", ".join(str(arg) for arg in args)
 
     @classmethod
     def color_print(cls, color, *args):
-        msg = ", ".join(str(arg) for arg in args)
+        msg = cls.format_message(args)
         if not cls.USE_COLORS:
             print(msg); return
         color = [color] if not isinstance(color, (tuple, list)) else color
         print(f"{cls.ansi(*color)}{msg}{cls.ansi(cls._style.RESET)}")
 
     @classmethod
-    def info(cls, *args):
-        cls.color_print(cls._style.BLUE, *args)
+    def log(cls, level, color, args, caller=False, depth=2):
+        """Emit a message if ``level`` is enabled.
+
+        Nothing is formatted and no frame is inspected unless the level
+        passes, so disabled calls return almost immediately.
+        """
+        if level < cls.level:
+            return
+        if caller:
+            args = (Caller.format_caller_info(Caller.get_caller_info(depth)),) + args
+        msg = cls.format_message(args)
+        if cls.sink is not None:
+            module = sys._getframe(depth).f_globals.get("__name__", "")
+            span_id = cls.span_id_getter() if cls.span_id_getter else None
+            cls.sink.emit(cls.LEVEL_NAMES.get(level, str(level)), module, msg, span_id)
+        if cls.USE_CONSOLE:
+            cls.color_print(color, msg)
 
     @classmethod
-    def warn(cls, *args):
-        cls.color_print(cls._style.YELLOW, *args)
+    def debug(cls, *args, caller=False):
+        cls.log(cls.DEBUG, cls._style.WHITE, args, caller)
+
+    @classmethod
+    def info(cls, *args, caller=False):
+        cls.log(cls.INFO, cls._style.BLUE, args, caller)
+
+    @classmethod
+    def warn(cls, *args, caller=False):
+        cls.log(cls.WARNING, cls._style.YELLOW, args, caller)
     
     @classmethod
-    def error(cls, *args):
-        cls.color_print(cls._style.RED, *args)
+    def error(cls, *args, caller=False):
+        cls.log(cls.ERROR, cls._style.RED, args, caller)
     
     # --- Additional methods ---
 
@@ -132,10 +236,17 @@ class Log:
 
 
 class DebugTimer:
+    """Stopwatch for quick measurements. Nested ``with`` blocks are
+    timed independently; see ``profiler`` for aggregated spans."""
+
     def __init__(self):
-        self._start_time = None
+        self._start_times = []
         self._lap_times = []
 
+    @property
+    def _start_time(self):
+        return self._start_times[-1] if self._start_times else None
+
     def print_time(self, *args):
         color = (
             Log._style.WHITE + 10,  # White background
@@ -144,24 +255,29 @@ class DebugTimer:
         Log.color_print(color, *args)
 
     def start(self, msg=None, title=None):
-        if self._start_time is not None:
-            raise RuntimeError("Timer is already running.")
-        self._start_time = time()
-        Log.header(msg, title)
+        self._start_times.append(perf_counter())
+        Log.header(*([msg] if msg is not None else []), title=title)
 
     def elapsed(self):
         if self._start_time is None:
             raise RuntimeError("Timer has not been started.")
-        return time() - self._start_time
+        return perf_counter() - self._start_time
+
+    def stop(self):
+        elapsed = self.elapsed()
+        self._start_times.pop()
+        if not self._start_times:
+            self._lap_times.clear()
+        return elapsed
 
     def reset(self):
-        self._start_time = None
+        self._start_times.clear()
         self._lap_times.clear()
 
     def lap(self, label=None):
         if self._start_time is None:
             raise RuntimeError("Timer has not been started.")
-        lap_time = time() - self._start_time
+        lap_time = perf_counter() - self._start_time
         self._lap_times.append((label, lap_time))
         
         self.print_time(f"- Lap {len(self._lap_times)}: {label if label else 'No label'} - {lap_time:.4f} ")
@@ -173,9 +289,8 @@ class DebugTimer:
 
     def __exit__(self, exc_type, exc_value, traceback):
         if self._start_time is not None:
-            elapsed = self.elapsed()
+            elapsed = self.stop()
             self.print_time(f"Elapsed time: {elapsed:.4f} sec")
-            self.reset()
 
         if exc_type is not None:
             Log.error(f"An exception occurred: {exc_value}\n{Log.ansi(Log._style.CYAN)}{traceback}")
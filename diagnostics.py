@@ -0,0 +1,208 @@
+import bpy
+from bpy.types import Operator
+from bpy.props import StringProperty
+
+import os
+
+from . addon import USER_DATA_PATH
+from . debug_utils import Log
+from . log_sink import LogSink
+from . metrics import metrics
+from . profiler import profiler
+
+
+LOG_DIR = os.path.join(USER_DATA_PATH, "logs")
+
+log_sink = LogSink(os.path.join(LOG_DIR, "bcs_log.jsonl"))
+
+
+def attach_log_sink(value):
+    """Route Log events into the sink's ring buffer, which stays
+    attached while the addon is enabled so dumps always have events."""
+    if value:
+        Log.sink = log_sink
+        Log.span_id_getter = profiler.current_span_id
+    else:
+        Log.sink = None
+        Log.span_id_getter = None
+
+
+def enable_log_sink(value):
+    """Start or stop writing the sink's events to the log file."""
+    if value:
+        log_sink.start()
+    else:
+        log_sink.stop()
+
+
+class BONECOLOR_OT_export_profile(Operator):
+    """Export recorded profiler spans as a Chrome trace file"""
+    bl_idname = "bonecolor.export_profile"
+    bl_label = "Export Profile Trace"
+    bl_options = {'REGISTER'}
+
+    filepath: StringProperty(
+        subtype='FILE_PATH',
+        default="",
+    )
+    filter_glob: StringProperty(default="*.json", options={'HIDDEN'})
+
+    def execute(self, context):
+        count = profiler.export_chrome_trace(self.filepath)
+        self.report({'INFO'}, f"Exported {count} profile events to {self.filepath}")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        if not os.path.exists(LOG_DIR):
+            os.makedirs(LOG_DIR)
+        self.filepath = os.path.join(LOG_DIR, "bcs_trace.json")
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+
+class BONECOLOR_OT_profile_report(Operator):
+    """Print aggregated profiler statistics to the console"""
+    bl_idname = "bonecolor.profile_report"
+    bl_label = "Print Profile Report"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        profiler.report()
+        return {'FINISHED'}
+
+
+class BONECOLOR_OT_profile_reset(Operator):
+    """Clear all recorded profiler spans"""
+    bl_idname = "bonecolor.profile_reset"
+    bl_label = "Reset Profile"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        profiler.reset()
+        return {'FINISHED'}
+
+
+class BONECOLOR_OT_dump_log(Operator):
+    """Write the recent log events to a file for bug reports"""
+    bl_idname = "bonecolor.dump_log"
+    bl_label = "Dump Recent Log"
+    bl_options = {'REGISTER'}
+
+    filepath: StringProperty(
+        subtype='FILE_PATH',
+        default="",
+    )
+    filter_glob: StringProperty(default="*.jsonl", options={'HIDDEN'})
+
+    def execute(self, context):
+        count = log_sink.dump(self.filepath)
+        self.report({'INFO'}, f"Dumped {count} log events to {self.filepath}")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        if not os.path.exists(LOG_DIR):
+            os.makedirs(LOG_DIR)
+        self.filepath = os.path.join(LOG_DIR, "bcs_log_dump.jsonl")
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+
+class BONECOLOR_OT_export_metrics(Operator):
+    """Export operator counts and latency histograms as JSON"""
+    bl_idname = "bonecolor.export_metrics"
+    bl_label = "Export Metrics"
+    bl_options = {'REGISTER'}
+
+    filepath: StringProperty(
+        subtype='FILE_PATH',
+        default="",
+    )
+    filter_glob: StringProperty(default="*.json", options={'HIDDEN'})
+
+    def execute(self, context):
+        metrics.export_json(self.filepath)
+        self.report({'INFO'}, f"Exported metrics to {self.filepath}")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        if not os.path.exists(LOG_DIR):
+            os.makedirs(LOG_DIR)
+        self.filepath = os.path.join(LOG_DIR, "bcs_metrics.json")
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+
+class BONECOLOR_OT_reset_metrics(Operator):
+    """Clear all operator counts and latencies"""
+    bl_idname = "bonecolor.reset_metrics"
+    bl_label = "Reset Metrics"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        metrics.reset()
+        return {'FINISHED'}
+
+
+def draw_metrics(layout):
+    row = layout.row()
+    row.label(text="Operator")
+    row.label(text="Count")
+    row.label(text="p50")
+    row.label(text="p95")
+    row.label(text="Max")
+
+    for name, hist in sorted(metrics.histograms.items()):
+        if not hist.count:
+            continue
+        row = layout.row()
+        row.alert = hist.cancelled > 0
+        row.label(text=name.split(".")[-1])
+        count = f"{hist.count}" + (f" ({hist.cancelled} failed)" if hist.cancelled else "")
+        row.label(text=count)
+        row.label(text=f"{hist.percentile(50) * 1e3:.2f} ms")
+        row.label(text=f"{hist.percentile(95) * 1e3:.2f} ms")
+        row.label(text=f"{hist.max * 1e3:.2f} ms")
+
+    row = layout.row(align=True)
+    row.operator("bonecolor.export_metrics", icon='EXPORT', text="Export Metrics")
+    row.operator("bonecolor.reset_metrics", icon='X', text="Reset")
+
+
+def draw_log_sink(layout, pr):
+    row = layout.row(align=True)
+    row.prop(pr, "use_log_sink", toggle=True, icon='FILE_TEXT')
+    row.prop(pr, "use_log_console", toggle=True, icon='CONSOLE')
+    row.operator("bonecolor.dump_log", text="", icon='EXPORT')
+    if pr.use_log_sink and log_sink.error:
+        layout.label(text=f"Log file unavailable: {log_sink.error}", icon='ERROR')
+
+
+def draw_profiler(layout, pr):
+    row = layout.row(align=True)
+    row.prop(pr, "use_profiler", toggle=True, icon='TIME')
+    row.operator("bonecolor.profile_report", text="", icon='TEXT')
+    row.operator("bonecolor.export_profile", text="", icon='EXPORT')
+    row.operator("bonecolor.profile_reset", text="", icon='X')
+
+
+classes = (
+    BONECOLOR_OT_export_profile,
+    BONECOLOR_OT_profile_report,
+    BONECOLOR_OT_profile_reset,
+    BONECOLOR_OT_dump_log,
+    BONECOLOR_OT_export_metrics,
+    BONECOLOR_OT_reset_metrics,
+)
+
+_register, _unregister = bpy.utils.register_classes_factory(classes)
+
+
+def register():
+    attach_log_sink(True)
+    _register()
+
+
+def unregister():
+    enable_log_sink(False)
+    attach_log_sink(False)
+    _unregister()
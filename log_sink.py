@@ -0,0 +1,122 @@
+import json
+import os
+import queue
+import threading
+from collections import deque
+from time import time
+
+
+_STOP = object()
+
+
+class LogSink:
+    """Structured log sink.
+
+    Events are kept in a bounded in-memory ring buffer and handed to a
+    background thread that appends them as JSON lines to a rotating
+    file. ``emit`` only touches the deque and a lock-free queue, so the
+    calling thread never waits on disk I/O.
+    """
+
+    def __init__(self, filepath, capacity=2000, max_bytes=1024 * 1024, backup_count=3):
+        self.filepath = filepath
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.buffer = deque(maxlen=capacity)
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        # Last file error; the ring buffer keeps working without the file.
+        self.error = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def emit(self, level, module, message, span_id=None):
+        event = {
+            "ts": time(),
+            "level": level,
+            "module": module,
+            "message": message,
+        }
+        if span_id is not None:
+            event["span"] = span_id
+        self.buffer.append(event)
+        if self._thread is not None:
+            self._queue.put(event)
+        return event
+
+    def recent(self, count=None):
+        events = list(self.buffer)
+        return events if count is None else events[-count:]
+
+    def dump(self, filepath, count=None):
+        """Write the buffered events to ``filepath`` as JSON lines."""
+        events = self.recent(count)
+        with open(filepath, 'w') as f:
+            for event in events:
+                f.write(json.dumps(event))
+                f.write("\n")
+        return len(events)
+
+    def start(self):
+        if self.running:
+            return
+        directory = os.path.dirname(self.filepath)
+        try:
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+        except OSError as e:
+            self.error = str(e)
+            return
+        self.error = None
+        self._thread = threading.Thread(
+            target=self._run, name="BCSLogSink", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Flush pending events and stop the writer thread."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._thread = None
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def _rotate(self):
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.filepath}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.filepath}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.filepath, f"{self.filepath}.1")
+        else:
+            os.remove(self.filepath)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            # Drain whatever else is queued so that bursts cost one write.
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in batch:
+                stopping = True
+                batch = [e for e in batch if e is not _STOP]
+            if not batch:
+                continue
+            try:
+                with open(self.filepath, 'a') as f:
+                    for event in batch:
+                        f.write(json.dumps(event))
+                        f.write("\n")
+                    size = f.tell()
+                if size >= self.max_bytes:
+                    self._rotate()
+            except OSError as e:
+                # Losing file output must never take down the session;
+                # the ring buffer still holds the events.
+                self.error = str(e)
@@ -0,0 +1,112 @@
+import functools
+import json
+from bisect import bisect_left
+from time import perf_counter
+
+
+# Upper bounds of the latency buckets in seconds: 10us doubling up to ~10s.
+BUCKET_BOUNDS = tuple(1e-5 * 2 ** i for i in range(21))
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram. Recording is one bisect and a
+    few integer updates, so it can stay on in production."""
+    __slots__ = ("count", "cancelled", "total", "max", "buckets")
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.cancelled = 0
+        self.total = 0.0
+        self.max = 0.0
+        # One extra bucket for anything slower than the last bound.
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+
+    def record(self, duration, cancelled=False):
+        self.count += 1
+        if cancelled:
+            self.cancelled += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        self.buckets[bisect_left(BUCKET_BOUNDS, duration)] += 1
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the given percentile."""
+        if not self.count:
+            return 0.0
+        rank = pct / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(BUCKET_BOUNDS[i], self.max) if i < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "cancelled": self.cancelled,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "buckets": {f"{bound:g}": n for bound, n in zip(BUCKET_BOUNDS + (float("inf"),), self.buckets) if n},
+        }
+
+
+class MetricsRegistry:
+    """In-memory operator counters and latency histograms.
+
+    Operators run on Blender's main thread, so updates are not locked.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+
+    def histogram(self, name):
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = LatencyHistogram()
+        return hist
+
+    def timed(self, name):
+        """Decorator recording latency and outcome of an operator method."""
+        def decorator(func):
+            hist = self.histogram(name)
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = perf_counter()
+                cancelled = True
+                try:
+                    result = func(*args, **kwargs)
+                    # Blender treats an execute returning None as an error.
+                    cancelled = result is None or 'CANCELLED' in result
+                    return result
+                finally:
+                    hist.record(perf_counter() - start, cancelled)
+            return wrapper
+        return decorator
+
+    def instrument_operator(self, cls):
+        """Class decorator timing ``execute`` of an operator as its bl_idname."""
+        cls.execute = self.timed(cls.bl_idname)(cls.execute)
+        return cls
+
+    def snapshot(self):
+        return {name: hist.as_dict() for name, hist in sorted(self.histograms.items())}
+
+    def reset(self):
+        for hist in self.histograms.values():
+            hist.clear()
+
+    def export_json(self, filepath):
+        with open(filepath, 'w') as f:
+            json.dump(self.snapshot(), f, indent=4)
+
+
+metrics = MetricsRegistry()
@@ -1,13 +1,20 @@
 import bpy
 from bpy.types import AddonPreferences, UIList
-from bpy.props import CollectionProperty, IntProperty, BoolProperty
+from bpy.props import CollectionProperty, IntProperty, FloatProperty, BoolProperty, EnumProperty, StringProperty
 
 from bl_ui.space_userpref import USERPREF_PT_theme_bone_color_sets
 
 from . bone_color_sets import BCSPresets
 
 from . addon import ADDON_ID, prefs, uprefs
-from . debug_utils import Log, DBG_PREFS, DBG_JSON
+from . debug_utils import Log, Lazy, DBG_PREFS, DBG_JSON, DBG_OPS, debug_flags, set_debug_flag
+from . profiler import profiler
+from . metrics import metrics
+from . diagnostics import draw_profiler, draw_log_sink, draw_metrics, enable_log_sink
+from . preset_blend import BLEND_SPACE_ITEMS, blend_target_items, draw_blend
+from . preset_audit import draw_audit, flagged_theme_sets
+from . preset_library import draw_library, update_preset_store_path, update_use_preset_store, update_working_set_size
+from . preset_sync import draw_sync, start_sync, update_use_sync
 
 
 class BoneColorSetsEditor(bpy.types.PropertyGroup):
@@ -49,6 +56,7 @@ class BoneColorSetsEditor(bpy.types.PropertyGroup):
             ed.selected = value
 
 
+@metrics.instrument_operator
 class BONECOLOR_OT_EditValue(bpy.types.Operator):
     bl_idname = "bonecolor.edit_value"
     bl_label = "Edit Value"
@@ -87,6 +95,7 @@ class BONECOLOR_OT_EditValue(bpy.types.Operator):
     def poll(cls, context):
         return len(BoneColorSetsEditor.get_selected(uprefs().themes[0])) > 0
 
+    @profiler.profile()
     def execute(self, context):
         theme = uprefs(context).themes[0]
         val_index = ("HUE", "SATURATION", "VALUE").index(self.target_value)
@@ -114,9 +123,12 @@ class BONECOLOR_OT_EditValue(bpy.types.Operator):
             # Convert the list back to a tuple and update the color
             trg.hsv = tuple(current_hsv)
 
+            DBG_OPS and Log.debug(Lazy(lambda: f"{self.target_value} -> {new_value:.3f}"), trg[:])
+
         return {'FINISHED'}
 
 
+@metrics.instrument_operator
 class BONECOLOR_OT_SelectAll(bpy.types.Operator):
     bl_idname = "bonecolor.select_all"
     bl_label = "Select All"
@@ -128,11 +140,44 @@ class BONECOLOR_OT_SelectAll(bpy.types.Operator):
         default=True
     )
 
+    @profiler.profile()
     def execute(self, context):
         BoneColorSetsEditor.set_all_selected(self.value)
         return {'FINISHED'}
 
 
+def _update_debug_flag(name):
+    def update(self, context):
+        set_debug_flag(name, getattr(self, name.lower()))
+    return update
+
+
+def _update_log_level(self, context):
+    Log.set_level(self.log_level)
+
+
+def _update_profiler(self, context):
+    profiler.enabled = self.use_profiler
+
+
+def _update_log_sink(self, context):
+    enable_log_sink(self.use_log_sink)
+
+
+def _update_log_console(self, context):
+    Log.USE_CONSOLE = self.use_log_console
+
+
+def apply_debug_settings(pr):
+    """Push the stored debug preferences into debug_utils."""
+    for name in debug_flags():
+        set_debug_flag(name, getattr(pr, name.lower()))
+    Log.set_level(pr.log_level)
+    profiler.enabled = pr.use_profiler
+    Log.USE_CONSOLE = pr.use_log_console
+    enable_log_sink(pr.use_log_sink)
+
+
 class BCSPreferences(AddonPreferences):
     bl_idname = ADDON_ID
 
@@ -149,6 +194,104 @@ class BCSPreferences(AddonPreferences):
         ),
     )
 
+    log_level: EnumProperty(
+        name="Log Level",
+        items=(
+            ("DEBUG", "Debug", "Log everything"),
+            ("INFO", "Info", "Log informational messages and above"),
+            ("WARNING", "Warning", "Log warnings and errors"),
+            ("ERROR", "Error", "Log errors only"),
+        ),
+        default="INFO",
+        update=_update_log_level,
+    )
+    dbg_init: BoolProperty(name="Init", update=_update_debug_flag("DBG_INIT"))
+    dbg_ops: BoolProperty(name="Operators", update=_update_debug_flag("DBG_OPS"))
+    dbg_json: BoolProperty(name="JSON", update=_update_debug_flag("DBG_JSON"))
+    dbg_prefs: BoolProperty(name="Preferences", update=_update_debug_flag("DBG_PREFS"))
+    use_profiler: BoolProperty(
+        name="Profiler",
+        description="Record timings of operators and panel drawing",
+        update=_update_profiler,
+    )
+    use_preset_store: BoolProperty(
+        name="Preset Library",
+        description="Keep presets in a SQLite library and only a working set in the preferences. "
+                    "Turning it off brings all library presets back into the preferences",
+        default=False,
+        update=update_use_preset_store,
+    )
+    preset_store_path: StringProperty(
+        name="Library File",
+        description="SQLite preset library; empty uses ~/.bone_color_presets/presets.sqlite",
+        subtype='FILE_PATH',
+        update=update_preset_store_path,
+    )
+    preset_working_set_size: IntProperty(
+        name="Working Set",
+        description="Number of recently used presets kept in the preferences, besides pinned ones",
+        default=20,
+        min=1,
+        update=update_working_set_size,
+    )
+    use_sync: BoolProperty(
+        name="Sync",
+        description="Share saved, removed and renamed presets with other Blender instances",
+        default=False,
+        update=update_use_sync,
+    )
+    sync_directory: StringProperty(
+        name="Sync Folder",
+        description="Folder holding the shared change log; empty uses ~/.bone_color_presets/sync",
+        subtype='DIR_PATH',
+        update=update_use_sync,
+    )
+    sync_interval: FloatProperty(
+        name="Sync Interval",
+        description="Seconds between checks for changes made by other instances",
+        default=1.0,
+        min=0.1,
+    )
+    blend_target: EnumProperty(
+        name="Blend Target",
+        description="Preset to blend the active preset towards",
+        items=blend_target_items,
+    )
+    blend_space: EnumProperty(
+        name="Blend Space",
+        items=BLEND_SPACE_ITEMS,
+    )
+    show_diagnostics: BoolProperty(
+        name="Diagnostics",
+        description="Show operator counts and latencies",
+        default=False,
+    )
+    use_log_sink: BoolProperty(
+        name="Log File",
+        description="Also write log events as JSON lines to ~/.bone_color_presets/logs. "
+                    "Recent events are always kept in memory for Dump Recent Log",
+        default=False,
+        update=_update_log_sink,
+    )
+    use_log_console: BoolProperty(
+        name="Console",
+        description="Print log messages to the system console",
+        default=True,
+        update=_update_log_console,
+    )
+
+    def draw(self, context):
+        layout = self.layout
+        col = layout.column()
+        col.label(text="Debug", icon='CONSOLE')
+        col.prop(self, "log_level")
+        row = col.row(align=True)
+        for name in debug_flags():
+            row.prop(self, name.lower(), toggle=True)
+        col.prop(self, "preset_store_path")
+        draw_log_sink(col, self)
+        draw_profiler(col, self)
+
 
 class BONECOLOR_UL_presets_bone_color_sets(UIList):
     def draw_item(self, context, layout, data, item, 
@@ -156,6 +299,9 @@ class BONECOLOR_UL_presets_bone_color_sets(UIList):
         # item: BCSPresets
         if self.layout_type in {'DEFAULT', 'COMPACT'}:
             layout.prop(item, "name", text="", emboss=False)
+            if data.use_preset_store:
+                layout.prop(item, "pinned", text="", emboss=False,
+                            icon='PINNED' if item.pinned else 'UNPINNED')
         elif self.layout_type in {'GRID'}:
             layout.alignment = 'CENTER'
             layout.label(text="")
@@ -165,6 +311,7 @@ class BoneColorPresetsUI:
     def __init__(self):
         self.original_draw = None
 
+    @profiler.profile("BoneColorPresetsUI.draw_presets")
     def draw_presets(self, context, layout):
         pr = prefs(context)
 
@@ -184,14 +331,28 @@ class BoneColorPresetsUI:
             row.operator("bonecolor.remove_preset", icon='TRASH', text="Remove Preset")
             row.operator("bonecolor.load_preset", icon='IMPORT', text="Load Preset")
 
+            if len(pr.bcs_presets) > 1:
+                draw_blend(box, pr)
+
         subrow = box.row()
         subrow.operator("bonecolor.export_preset", icon='EXPORT', text="Export Presets")
         subrow.operator("bonecolor.import_preset", icon='IMPORT', text="Import Presets")
 
+        draw_library(box, pr)
+        draw_sync(box, pr)
+        draw_audit(box)
+
+        row = box.row()
+        row.prop(pr, "show_diagnostics", emboss=False,
+                 icon='TRIA_DOWN' if pr.show_diagnostics else 'TRIA_RIGHT')
+        if pr.show_diagnostics:
+            draw_metrics(box.box())
+
         layout.separator()
 
         self.draw_color_sets(context, layout)
     
+    @profiler.profile("BoneColorPresetsUI.draw_color_sets")
     def draw_color_sets(self, context, layout):
         theme = context.preferences.themes[0]
         pr = prefs(context)
@@ -244,8 +405,10 @@ class BoneColorPresetsUI:
         layout.separator()
                
 
+        flagged = flagged_theme_sets(theme.bone_color_sets)
         for i, (ui, ed) in enumerate(zip(theme.bone_color_sets, pr.ed_bone_color_sets), 1):
             row = layout.row(align=True)
+            row.alert = (i - 1) in flagged
             
             row.prop(ed, "selected", text=f"Set {i}")
 
@@ -280,6 +443,8 @@ def register():
     for cls in classes:
         register_class(cls)
 
+    apply_debug_settings(prefs())
+    start_sync(prefs())
     BoneColorSetsEditor.initialize(uprefs().themes[0])
 
     bone_color_presets_ui.ui_register()
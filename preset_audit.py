@@ -0,0 +1,253 @@
+import bpy
+from bpy.types import Operator
+from bpy.props import EnumProperty, FloatProperty
+
+import numpy as np
+
+from . addon import prefs, uprefs
+from . bone_color_sets import COLOR_STATES, color_sets_to_array
+from . color_math import srgb_to_lab, relative_luminance, contrast_ratio
+from . debug_utils import Log
+from . metrics import metrics
+
+
+# Pairs of indices into COLOR_STATES checked within each set.
+STATE_PAIRS = ((0, 1), (0, 2), (1, 2))
+
+MIN_STATE_DELTA_E = 8.0
+MIN_STATE_CONTRAST = 1.05
+MIN_SET_DELTA_E = 10.0
+
+# Number of worst problems kept for the report.
+REPORT_LIMIT = 50
+# Number of them listed in the preferences.
+DRAW_LIMIT = 10
+
+
+class AuditReport:
+    """Audit results for a stack of palettes of equal size.
+
+    ``state_delta_e`` and ``state_contrast`` are (palettes, sets, pairs),
+    ``set_delta_e`` is (palettes, sets, sets): the mean difference of
+    matching states between two sets.
+    """
+
+    def __init__(self, names, state_delta_e, state_contrast, set_delta_e, used,
+                 min_state_delta_e, min_state_contrast, min_set_delta_e):
+        self.names = names
+        self.state_delta_e = state_delta_e
+        self.state_contrast = state_contrast
+        self.set_delta_e = set_delta_e
+        self.used = used
+
+        self.state_problems = used[..., None] & (
+            (state_delta_e < min_state_delta_e) | (state_contrast < min_state_contrast))
+        pair_used = used[:, :, None] & used[:, None, :]
+        upper = np.triu(np.ones(set_delta_e.shape[1:], dtype=bool), k=1)
+        self.set_problems = pair_used & upper & (set_delta_e < min_set_delta_e)
+
+    def flagged_sets(self, palette=0):
+        """Indices of sets involved in any problem of one palette."""
+        flagged = set(np.nonzero(self.state_problems[palette].any(axis=-1))[0].tolist())
+        a, b = np.nonzero(self.set_problems[palette])
+        flagged.update(a.tolist())
+        flagged.update(b.tolist())
+        return flagged
+
+    def issues(self):
+        """All problems as dicts, least distinguishable first."""
+        issues = []
+        for p, s, k in zip(*np.nonzero(self.state_problems)):
+            i, j = STATE_PAIRS[k]
+            issues.append({
+                "preset": self.names[p],
+                "palette": int(p),
+                "kind": "STATE",
+                "set": int(s) + 1,
+                "pair": f"{COLOR_STATES[i]}/{COLOR_STATES[j]}",
+                "delta_e": float(self.state_delta_e[p, s, k]),
+                "contrast": float(self.state_contrast[p, s, k]),
+            })
+        for p, a, b in zip(*np.nonzero(self.set_problems)):
+            issues.append({
+                "preset": self.names[p],
+                "palette": int(p),
+                "kind": "SETS",
+                "set": int(a) + 1,
+                "pair": f"set {int(b) + 1}",
+                "delta_e": float(self.set_delta_e[p, a, b]),
+                "contrast": None,
+            })
+        issues.sort(key=lambda issue: issue["delta_e"])
+        return issues
+
+
+def audit_palettes(palettes, names=None,
+                   min_state_delta_e=MIN_STATE_DELTA_E,
+                   min_state_contrast=MIN_STATE_CONTRAST,
+                   min_set_delta_e=MIN_SET_DELTA_E):
+    """Audit a (palettes, sets, states, rgb) array of sRGB colors.
+
+    Sets that are entirely black are treated as unused placeholders.
+    """
+    palettes = np.asarray(palettes, dtype=np.float64)
+    if names is None:
+        names = [str(i) for i in range(len(palettes))]
+
+    lab = srgb_to_lab(palettes)
+    lum = relative_luminance(palettes)
+    first, second = np.array(STATE_PAIRS).T
+
+    state_delta_e = np.linalg.norm(lab[:, :, first] - lab[:, :, second], axis=-1)
+    state_contrast = contrast_ratio(lum[:, :, first], lum[:, :, second])
+    set_delta_e = np.linalg.norm(
+        lab[:, :, None] - lab[:, None, :], axis=-1).mean(axis=-1)
+    used = palettes.reshape(palettes.shape[0], palettes.shape[1], -1).any(axis=-1)
+
+    return AuditReport(names, state_delta_e, state_contrast, set_delta_e, used,
+                       min_state_delta_e, min_state_contrast, min_set_delta_e)
+
+
+class _AuditState:
+    """Results of the last audit shown in the preferences."""
+    issues = []
+    total = 0
+    palettes = 0
+    # Theme colors the flagged sets were computed for; any edit of the
+    # theme invalidates them.
+    theme_array = None
+    theme_sets = set()
+
+
+def flagged_theme_sets(color_sets):
+    """Theme set indices flagged by the last theme audit, if the theme
+    still has the audited colors."""
+    state = _AuditState
+    if state.theme_array is None:
+        return state.theme_sets
+    if not np.array_equal(color_sets_to_array(color_sets), state.theme_array):
+        state.theme_array = None
+        state.theme_sets = set()
+    return state.theme_sets
+
+
+def format_issue(issue):
+    contrast = f", contrast {issue['contrast']:.2f}" if issue["contrast"] is not None else ""
+    return (f"{issue['preset']}: set {issue['set']} {issue['pair']} "
+            f"dE {issue['delta_e']:.1f}{contrast}")
+
+
+@metrics.instrument_operator
+class BONECOLOR_OT_audit_presets(Operator):
+    """Check that bone color states and sets are distinguishable"""
+    bl_idname = "bonecolor.audit_presets"
+    bl_label = "Audit Bone Color Presets"
+    bl_options = {'REGISTER'}
+
+    scope: EnumProperty(
+        name="Scope",
+        items=(
+            ("THEME", "Theme", "Audit the current theme colors"),
+            ("ACTIVE", "Active Preset", "Audit the active preset"),
+            ("ALL", "All Presets", "Audit the whole preset library"),
+        ),
+    )
+    min_state_delta_e: FloatProperty(name="Min State Delta E", default=MIN_STATE_DELTA_E, min=0.0)
+    min_state_contrast: FloatProperty(name="Min State Contrast", default=MIN_STATE_CONTRAST, min=1.0)
+    min_set_delta_e: FloatProperty(name="Min Set Delta E", default=MIN_SET_DELTA_E, min=0.0)
+
+    def _reports(self, context):
+        pr = prefs(context)
+        thresholds = (self.min_state_delta_e, self.min_state_contrast, self.min_set_delta_e)
+        if self.scope == 'THEME':
+            array = color_sets_to_array(uprefs(context).themes[0].bone_color_sets)
+            return [audit_palettes(array[None], ["Theme"], *thresholds)]
+        if self.scope == 'ACTIVE':
+            preset = pr.bcs_presets[pr.active_bcs_preset_index]
+            return [audit_palettes(preset.to_array()[None], [preset.name], *thresholds)]
+
+        groups = {}
+        for i, preset in enumerate(pr.bcs_presets):
+            groups.setdefault(len(preset.color_sets), []).append(i)
+        reports = []
+        for count, indices in groups.items():
+            if not count:
+                continue
+            array = np.stack([pr.bcs_presets[i].to_array() for i in indices])
+            reports.append(audit_palettes(array, [pr.bcs_presets[i].name for i in indices], *thresholds))
+        return reports
+
+    def execute(self, context):
+        try:
+            reports = self._reports(context)
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to audit bone color presets: {e}")
+            return {'CANCELLED'}
+
+        state = _AuditState
+        # Only a theme audit describes the theme rows; preset problems
+        # are listed by name instead.
+        state.theme_array = None
+        state.theme_sets = set()
+        if self.scope == 'THEME':
+            state.theme_array = color_sets_to_array(uprefs(context).themes[0].bone_color_sets)
+            state.theme_sets = reports[0].flagged_sets(0)
+
+        issues = sorted(
+            (dict(issue, palette=(r, issue["palette"]))
+             for r, report in enumerate(reports) for issue in report.issues()),
+            key=lambda issue: issue["delta_e"])
+        state.issues = issues[:REPORT_LIMIT]
+        state.total = len(issues)
+        # Palettes are counted by position, since names can repeat.
+        state.palettes = len({issue["palette"] for issue in issues})
+        for issue in state.issues:
+            Log.warn(format_issue(issue))
+
+        level = 'WARNING' if issues else 'INFO'
+        self.report({level}, f"Audit found {state.total} problems in {state.palettes} palettes")
+        return {'FINISHED'}
+
+
+class BONECOLOR_OT_clear_audit(Operator):
+    """Hide the results of the last audit"""
+    bl_idname = "bonecolor.clear_audit"
+    bl_label = "Clear Audit Results"
+    bl_options = {'REGISTER', 'INTERNAL'}
+
+    def execute(self, context):
+        state = _AuditState
+        state.issues = []
+        state.total = state.palettes = 0
+        state.theme_array = None
+        state.theme_sets = set()
+        return {'FINISHED'}
+
+
+def draw_audit(layout):
+    row = layout.row(align=True)
+    row.label(text="Audit:")
+    for scope, text in (("THEME", "Theme"), ("ACTIVE", "Active"), ("ALL", "All Presets")):
+        row.operator("bonecolor.audit_presets", text=text, icon='VIEWZOOM').scope = scope
+
+    state = _AuditState
+    if not state.issues:
+        return
+    box = layout.box()
+    row = box.row()
+    row.label(text=f"{state.total} problems in {state.palettes} palettes, least distinct first",
+              icon='ERROR')
+    row.operator("bonecolor.clear_audit", text="", icon='X', emboss=False)
+    col = box.column(align=True)
+    for issue in state.issues[:DRAW_LIMIT]:
+        col.label(text=format_issue(issue))
+    if state.total > DRAW_LIMIT:
+        col.label(text=f"... and {state.total - DRAW_LIMIT} more")
+
+
+classes = (
+    BONECOLOR_OT_audit_presets,
+    BONECOLOR_OT_clear_audit,
+)
+
+register, unregister = bpy.utils.register_classes_factory(classes)
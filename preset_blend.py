@@ -0,0 +1,228 @@
+import bpy
+from bpy.types import Operator
+from bpy.props import EnumProperty, FloatProperty, IntProperty, BoolProperty
+
+from . addon import prefs, uprefs
+from . bone_color_sets import color_sets_to_array, array_to_color_sets
+from . color_math import to_space, from_space
+from . debug_utils import Log, Lazy, DBG_OPS
+from . metrics import metrics
+from . preset_library import active_name, store_preset
+from . profiler import profiler
+
+
+BLEND_SPACE_ITEMS = (
+    ("OKLAB", "OKLab", "Interpolate in a perceptually uniform space"),
+    ("LINEAR", "Linear RGB", "Interpolate light intensities"),
+    ("RGB", "sRGB", "Interpolate the stored display values"),
+)
+
+# Theme writes are coalesced to at most one per redraw.
+REDRAW_INTERVAL = 1.0 / 60.0
+
+# Blender needs the enum strings to stay referenced while they are shown.
+_target_items = []
+
+
+def blend_target_items(self, context):
+    """Presets keyed by index, since preset names need not be unique."""
+    _target_items[:] = [(str(i), p.name, "", i) for i, p in enumerate(self.bcs_presets)]
+    return _target_items
+
+
+def blend_target_index(pr):
+    try:
+        return int(pr.blend_target)
+    except ValueError:
+        return -1
+
+
+class PresetBlend:
+    """Two presets converted once to the blend space.
+
+    Each frame is a single lerp over the whole (sets, states, channels)
+    array followed by the conversion back to sRGB.
+    """
+
+    def __init__(self, source, target, space):
+        self.space = space
+        a = source.to_array()
+        b = target.to_array()
+        count = min(len(a), len(b))
+        self.start = to_space(a[:count], space)
+        self.delta = to_space(b[:count], space) - self.start
+        self.source_flags = [cs.show_colored_constraints for cs in source.color_sets][:count]
+        self.target_flags = [cs.show_colored_constraints for cs in target.color_sets][:count]
+
+    def frame(self, factor):
+        return from_space(self.start + self.delta * factor, self.space)
+
+    def flags(self, factor):
+        return self.source_flags if factor < 0.5 else self.target_flags
+
+
+def _tag_redraw_all(context):
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            area.tag_redraw()
+
+
+@metrics.instrument_operator
+class BONECOLOR_OT_blend_presets(Operator):
+    """Blend the active preset towards another preset (drag to scrub, click to apply)"""
+    bl_idname = "bonecolor.blend_presets"
+    bl_label = "Blend Bone Color Presets"
+    # No UNDO: there is no redo panel to re-run execute, since undo does
+    # not roll back presets added to the preferences.
+    bl_options = {'REGISTER'}
+
+    source_index: IntProperty(name="Source", default=-1)
+    target_index: IntProperty(name="Target", default=-1)
+    factor: FloatProperty(
+        name="Factor",
+        subtype='FACTOR',
+        min=0.0, max=1.0,
+        default=0.5,
+    )
+    space: EnumProperty(name="Space", items=BLEND_SPACE_ITEMS)
+    save_result: BoolProperty(
+        name="Save as Preset",
+        description="Store the blended palette as a new preset",
+        default=False,
+        options={'SKIP_SAVE'},
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return len(prefs(context).bcs_presets) > 1
+
+    def _presets(self, context):
+        presets = prefs(context).bcs_presets
+        if not (0 <= self.source_index < len(presets) and 0 <= self.target_index < len(presets)):
+            raise IndexError("Select two stored presets to blend")
+        return presets[self.source_index], presets[self.target_index]
+
+    def _apply(self, context, blend):
+        color_sets = uprefs(context).themes[0].bone_color_sets
+        with profiler.span("blend.frame"):
+            frame = blend.frame(self.factor)
+            if len(frame) != len(color_sets):
+                # Presets may hold any number of sets; theme sets outside
+                # the blended range keep their current colors.
+                array = color_sets_to_array(color_sets)
+                count = min(len(frame), len(array))
+                array[:count] = frame[:count]
+                frame = array
+            array_to_color_sets(color_sets, frame)
+
+    def _finish(self, context, blend):
+        if self.save_result:
+            pr = prefs(context)
+            source, target = self._presets(context)
+            preset = pr.bcs_presets.add()
+            preset.name = f"{source.name} / {target.name} {self.factor:.0%}"
+            preset.set_from_array(blend.frame(self.factor), blend.flags(self.factor))
+            pr.active_bcs_preset_index = len(pr.bcs_presets) - 1
+            if store_preset(pr, preset):
+                self.report({'INFO'}, f"New bone color preset saved: {preset.name}")
+            else:
+                self.report({'INFO'}, f"Bone color preset already in the library: {active_name(pr)}")
+        return {'FINISHED'}
+
+    def execute(self, context):
+        try:
+            source, target = self._presets(context)
+            blend = PresetBlend(source, target, self.space)
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to blend bone color presets: {e}")
+            return {'CANCELLED'}
+        self._apply(context, blend)
+        return self._finish(context, blend)
+
+    def invoke(self, context, event):
+        pr = prefs(context)
+        if self.source_index < 0:
+            self.source_index = pr.active_bcs_preset_index
+        if self.target_index < 0:
+            self.target_index = blend_target_index(pr)
+        try:
+            source, target = self._presets(context)
+            self._blend = PresetBlend(source, target, self.space)
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to blend bone color presets: {e}")
+            return {'CANCELLED'}
+
+        self._original = color_sets_to_array(uprefs(context).themes[0].bone_color_sets)
+        self._start_x = event.mouse_x
+        self._start_factor = self.factor
+        self._dirty = True
+
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(REDRAW_INTERVAL, window=context.window)
+        wm.modal_handler_add(self)
+        DBG_OPS and Log.debug(Lazy(lambda: f"Blending {source.name} -> {target.name} in {self.space}"))
+        return {'RUNNING_MODAL'}
+
+    def _header(self, context, text):
+        if context.area is not None:
+            context.area.header_text_set(text)
+
+    def _end_modal(self, context):
+        context.window_manager.event_timer_remove(self._timer)
+        self._header(context, None)
+        _tag_redraw_all(context)
+
+    def _cancel(self, context):
+        array_to_color_sets(uprefs(context).themes[0].bone_color_sets, self._original)
+        self._end_modal(context)
+
+    def modal(self, context, event):
+        if event.type == 'MOUSEMOVE':
+            factor = self._start_factor + (event.mouse_x - self._start_x) / 300.0
+            self.factor = min(1.0, max(0.0, factor))
+            self._dirty = True
+
+        elif event.type == 'TIMER':
+            if self._dirty:
+                self._dirty = False
+                try:
+                    self._apply(context, self._blend)
+                except Exception as e:
+                    self._cancel(context)
+                    self.report({'ERROR'}, f"Failed to blend bone color presets: {e}")
+                    return {'CANCELLED'}
+                self._header(
+                    context, f"Blend: {self.factor:.0%}  Save as Preset (S): {'On' if self.save_result else 'Off'}")
+                _tag_redraw_all(context)
+
+        elif event.type == 'S' and event.value == 'PRESS':
+            self.save_result = not self.save_result
+            self._dirty = True
+
+        elif event.type in {'LEFTMOUSE', 'RET', 'NUMPAD_ENTER'} and event.value == 'PRESS':
+            self._apply(context, self._blend)
+            self._end_modal(context)
+            return self._finish(context, self._blend)
+
+        elif event.type in {'RIGHTMOUSE', 'ESC'} and event.value == 'PRESS':
+            self._cancel(context)
+            return {'CANCELLED'}
+
+        return {'RUNNING_MODAL'}
+
+
+def draw_blend(layout, pr):
+    row = layout.row(align=True)
+    row.prop(pr, "blend_target", text="Blend To")
+    row.prop(pr, "blend_space", text="")
+    ops = row.operator("bonecolor.blend_presets", icon='MOD_SMOOTH', text="Blend")
+    ops.space = pr.blend_space
+    ops.source_index = pr.active_bcs_preset_index
+    ops.target_index = blend_target_index(pr)
+
+
+classes = (
+    BONECOLOR_OT_blend_presets,
+)
+
+register, unregister = bpy.utils.register_classes_factory(classes)
@@ -0,0 +1,166 @@
+"""Validate, migrate, deduplicate and convert bone color preset files.
+
+Runs without Blender:
+
+    python preset_cli.py validate "My Presets"
+    python preset_cli.py migrate presets/ --output migrated/
+    python preset_cli.py dedupe presets/ --delete
+    python preset_cli.py convert presets/ --format legacy --output legacy/
+
+Directories are searched recursively for *.json files and the files are
+processed in a process pool. Exits with status 1 if any file failed.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+if __package__:
+    from . import preset_schema as schema
+else:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import preset_schema as schema
+
+
+FORMATS = ("addon", "compact", "legacy")
+
+
+def collect_files(paths):
+    """Return sorted (path, relative path) pairs; the relative path is
+    taken from the directory argument a file was found in."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(
+                    (f, os.path.relpath(f, path))
+                    for f in (os.path.join(root, n) for n in names if n.lower().endswith(".json")))
+        else:
+            files.append((path, os.path.basename(path)))
+    return sorted(files)
+
+
+def read_preset(filepath, addon_id, target):
+    """Load and upgrade any supported file; returns (name, source version, color_sets)."""
+    data = schema.load_file(filepath)
+    version = schema.source_version(data)
+    name = os.path.splitext(os.path.basename(filepath))[0]
+    data = schema.upgrade(data, name, addon_id, target)
+    name, color_sets = schema.decode_preset(data, addon_id)
+    return name, version, color_sets
+
+
+def write_preset(filepath, name, color_sets, version, fmt, addon_id):
+    if fmt == "legacy":
+        data = [schema.normalize_color_set(cs, i) for i, cs in enumerate(color_sets)]
+        schema.dump_file(filepath, data, indent=None)
+        return
+    data = schema.encode_preset(name, color_sets, version, addon_id)
+    schema.dump_file(filepath, data, indent=None if fmt == "compact" else 4)
+
+
+def _output_path(filepath, relpath, args):
+    if not args.output:
+        return filepath
+    output = os.path.join(args.output, relpath)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    return output
+
+
+def process_file(task):
+    """Worker: handle one file and return a result dict."""
+    filepath, relpath, args = task
+    result = {"path": filepath, "error": None, "hash": None, "written": None, "version": None}
+    try:
+        name, version, color_sets = read_preset(filepath, args.addon_id, args.target_version)
+        result["version"] = version
+        result["hash"] = schema.preset_hash(color_sets)
+
+        if args.command == "migrate" and schema.parse_version(version) < args.target_version:
+            result["written"] = _output_path(filepath, relpath, args)
+            write_preset(result["written"], name, color_sets, args.target_version, "addon", args.addon_id)
+        elif args.command == "convert":
+            result["written"] = _output_path(filepath, relpath, args)
+            write_preset(result["written"], name, color_sets, args.target_version, args.format, args.addon_id)
+    except (OSError, schema.PresetError) as e:
+        result["error"] = str(e)
+    except Exception as e:
+        # Anything else is reported for this file instead of taking
+        # down the whole pool.
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def find_duplicates(results):
+    """Group results by content hash; returns lists of duplicate paths
+    with the first (sorted) path of each group kept."""
+    groups = {}
+    for result in results:
+        if result["hash"] is not None:
+            groups.setdefault(result["hash"], []).append(result["path"])
+    return [sorted(paths) for paths in groups.values() if len(paths) > 1]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=("validate", "migrate", "dedupe", "convert"))
+    parser.add_argument("paths", nargs="+", help="preset files or directories")
+    parser.add_argument("-o", "--output", help="write results here instead of in place")
+    parser.add_argument("-f", "--format", choices=FORMATS, default="addon",
+                        help="output format for convert")
+    parser.add_argument("--delete", action="store_true",
+                        help="dedupe: delete duplicates instead of listing them")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--addon-id", default=schema.RELEASE_ADDON_ID,
+                        help="expected 'addon' field in preset files")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.target_version = schema.read_addon_version()
+    if args.output and not os.path.exists(args.output):
+        os.makedirs(args.output)
+
+    files = collect_files(args.paths)
+    if args.output:
+        seen = {}
+        for filepath, relpath in files:
+            other = seen.setdefault(os.path.normcase(relpath), filepath)
+            if other != filepath:
+                print(f"ERROR {filepath} and {other} would both be written to "
+                      f"{os.path.join(args.output, relpath)}", file=sys.stderr)
+                return 1
+    tasks = [(f, rel, args) for f, rel in files]
+    if args.jobs == 1 or len(tasks) < 2:
+        results = [process_file(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(process_file, tasks, chunksize=max(1, len(tasks) // 64)))
+
+    errors = [r for r in results if r["error"]]
+    for r in errors:
+        print(f"ERROR {r['path']}: {r['error']}", file=sys.stderr)
+
+    written = [r for r in results if r["written"]]
+    for r in written:
+        print(f"{args.command}: {r['path']} -> {r['written']}")
+
+    duplicates = find_duplicates(results) if args.command == "dedupe" else []
+    for paths in duplicates:
+        keep, *extra = paths
+        for path in extra:
+            if args.delete:
+                os.remove(path)
+                print(f"removed duplicate {path} (same as {keep})")
+            else:
+                print(f"duplicate {path} (same as {keep})")
+
+    print(f"{len(files)} files, {len(errors)} errors, {len(written)} written, "
+          f"{sum(len(p) - 1 for p in duplicates)} duplicates")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
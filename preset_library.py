@@ -0,0 +1,450 @@
+import bpy
+from bpy.types import Operator
+from bpy.props import EnumProperty, StringProperty
+
+import os
+import sqlite3
+import uuid
+import numpy as np
+
+from . addon import prefs, ADDON_VERSION, USER_DATA_PATH
+from . debug_utils import Log, DBG_PREFS
+from . metrics import metrics
+from . preset_store import PresetStore
+
+
+DEFAULT_STORE_PATH = os.path.join(USER_DATA_PATH, "presets.sqlite")
+
+_store = None
+
+# Optional receiver of saved and removed presets (see
+# preset_sync.SyncPublisher), set while syncing is registered.
+change_listener = None
+
+
+def store_path(pr):
+    return bpy.path.abspath(pr.preset_store_path) if pr.preset_store_path else DEFAULT_STORE_PATH
+
+
+def get_store(pr):
+    """The open PresetStore, or None when the SQLite backend is off."""
+    global _store
+    if not pr.use_preset_store:
+        return None
+    path = store_path(pr)
+    if _store is None or _store.filepath != path:
+        close_store()
+        _store = PresetStore(path)
+    return _store
+
+
+def close_store():
+    global _store
+    if _store is not None:
+        _store.close()
+        _store = None
+
+
+def _color_sets(preset):
+    return [cs.as_dict() for cs in preset.color_sets]
+
+
+def is_stored(store, preset):
+    """Whether the store holds this very preset under its stored_name.
+
+    A name alone is not enough: presets created while the library was
+    off, or a library file swapped for another, may share names with
+    unrelated stored presets.
+    """
+    if not preset.stored_name:
+        return False
+    stored = store.get(preset.stored_name, touch=False)
+    if stored is None or len(stored) != len(preset.color_sets):
+        return False
+    # Stored data is normalized already. Compared with a tolerance:
+    # synced records are rounded and the color properties hold single
+    # precision floats.
+    values = np.array([[cs["normal"], cs["select"], cs["active"]] for cs in stored],
+                      dtype=np.float32).reshape(-1, 3, 3)
+    flags = [cs["show_colored_constraints"] for cs in stored]
+    return (flags == [cs.show_colored_constraints for cs in preset.color_sets]
+            and np.allclose(values, preset.to_array(), atol=1e-5))
+
+
+class _NameAllocator:
+    """Hands out Blender style ``Name.001`` names missing from ``taken``.
+
+    The last suffix is remembered per base name, so renaming many
+    presets that share a name (every save starts as "Preset 1") stays
+    linear.
+    """
+
+    def __init__(self, taken):
+        self.taken = set(taken)
+        self._next = {}
+
+    def __call__(self, name):
+        if name in self.taken:
+            i = self._next.get(name, 1)
+            while f"{name}.{i:03d}" in self.taken:
+                i += 1
+            self._next[name] = i + 1
+            name = f"{name}.{i:03d}"
+        self.taken.add(name)
+        return name
+
+
+def unique_name(name, taken):
+    return _NameAllocator(taken)(name)
+
+
+def new_sync_id():
+    return uuid.uuid4().hex
+
+
+def active_name(pr):
+    return pr.bcs_presets[pr.active_bcs_preset_index].name
+
+
+def _reuse_duplicate(pr, store, preset):
+    """Replace a just added preset by the stored one with the same colors.
+
+    Returns False when the library holds no such preset.
+    """
+    duplicates = store.find_same(_color_sets(preset))
+    if not duplicates:
+        return False
+    presets = pr.bcs_presets
+    presets.remove(next(i for i, p in enumerate(presets) if p == preset))
+    materialize(pr, duplicates[0])
+    return True
+
+
+def store_preset(pr, preset):
+    """Write a preset that was just added to the collection to the store
+    and shrink the collection back to the working set.
+
+    Returns False when the library already held the same colors; the
+    new entry is then dropped and the stored preset made active.
+    """
+    store = get_store(pr)
+    if store is not None and not preset.stored_name:
+        if _reuse_duplicate(pr, store, preset):
+            return False
+        name = unique_name(preset.name, store.names(preset.name))
+        preset.name = name
+        preset.stored_name = name
+    if not preset.sync_id:
+        preset.sync_id = new_sync_id()
+    if store is not None:
+        store.put(preset.stored_name, _color_sets(preset), ADDON_VERSION, sync_id=preset.sync_id)
+    if change_listener is not None:
+        change_listener.saved(pr, preset)
+    trim_working_set(pr)
+    return True
+
+
+def forget_preset(pr, preset):
+    store = get_store(pr)
+    if store is not None and is_stored(store, preset):
+        store.remove(preset.stored_name)
+    if change_listener is not None and preset.sync_id:
+        change_listener.removed(pr, preset.sync_id)
+
+
+def touch_preset(pr, preset):
+    store = get_store(pr)
+    if store is not None and is_stored(store, preset):
+        store.touch(preset.stored_name)
+
+
+def materialize(pr, name):
+    """Make ``name`` available in the collection, pulling it from the store."""
+    index = pr.bcs_presets.find(name)
+    if index < 0:
+        store = get_store(pr)
+        color_sets = store.get(name) if store is not None else None
+        if color_sets is None:
+            raise KeyError(f"Preset '{name}' not found")
+        preset = pr.bcs_presets.add()
+        preset.name = name
+        preset.stored_name = name
+        preset.sync_id = store.get_sync_id(name) or ""
+        preset.pinned = store.is_pinned(name)
+        for cs_data in color_sets:
+            preset.color_sets.add().from_dict(cs_data)
+        index = len(pr.bcs_presets) - 1
+    else:
+        touch_preset(pr, pr.bcs_presets[index])
+    pr.active_bcs_preset_index = index
+    trim_working_set(pr)
+    return pr.bcs_presets[pr.active_bcs_preset_index]
+
+
+def trim_working_set(pr, stored=()):
+    """Drop collection entries outside the store's working set.
+
+    The active preset always stays. Entries are only dropped once they
+    are known to the store, so nothing is lost; ``stored`` names the
+    ones just written, which need no check.
+    """
+    store = get_store(pr)
+    if store is None:
+        return
+    keep = set(store.working_set(pr.preset_working_set_size))
+    presets = pr.bcs_presets
+    active = presets[pr.active_bcs_preset_index].name \
+        if 0 <= pr.active_bcs_preset_index < len(presets) else None
+    keep.add(active)
+
+    for i in reversed(range(len(presets))):
+        preset = presets[i]
+        if preset.name in keep:
+            continue
+        if preset.stored_name in stored or is_stored(store, preset):
+            presets.remove(i)
+    if active is not None:
+        pr.active_bcs_preset_index = presets.find(active)
+
+
+def migrate_collection(pr):
+    """Copy every collection preset the store does not hold yet into it.
+
+    Runs whenever the library is enabled or its file changes, so
+    presets saved while it was off are never shadowed by stored ones
+    of the same name.
+    """
+    store = get_store(pr)
+    presets = pr.bcs_presets
+    store_names = store.names()
+    claimed = {p.stored_name for p in presets if is_stored(store, p)}
+    # New suffixes also avoid names in the collection, which keep theirs.
+    unique_name = _NameAllocator(store_names | {p.name for p in presets})
+    entries = []
+    for preset in presets:
+        if preset.stored_name in claimed:
+            continue
+        name = preset.name
+        if name in claimed or name in store_names:
+            # Older libraries may hold several presets with the same name.
+            name = unique_name(name)
+        claimed.add(name)
+        # Forget the old key first so the rename leaves the store alone.
+        preset.stored_name = ""
+        if preset.name != name:
+            preset.name = name
+        preset.stored_name = name
+        if not preset.sync_id:
+            preset.sync_id = new_sync_id()
+        entries.append((name, _color_sets(preset), preset.sync_id))
+    store.put_many(entries, ADDON_VERSION)
+    DBG_PREFS and Log.info(f"Migrated {len(entries)} presets to {store.filepath}")
+    trim_working_set(pr, stored={entry[0] for entry in entries})
+    return len(entries)
+
+
+def restore_collection(pr, store):
+    """Bring every stored preset back into the collection."""
+    present = {p.stored_name for p in pr.bcs_presets if p.stored_name}
+    count = 0
+    for name, sync_id, color_sets in store.items():
+        if name in present:
+            continue
+        preset = pr.bcs_presets.add()
+        preset.name = name
+        preset.stored_name = name
+        preset.sync_id = sync_id or ""
+        for cs_data in color_sets:
+            preset.color_sets.add().from_dict(cs_data)
+        count += 1
+    return count
+
+
+def update_use_preset_store(self, context):
+    if self.use_preset_store:
+        migrate_collection(self)
+        return
+    close_store()
+    path = store_path(self)
+    if not os.path.exists(path):
+        return
+    # Presets outside the working set would be unreachable otherwise.
+    store = PresetStore(path)
+    try:
+        count = restore_collection(self, store)
+    finally:
+        store.close()
+    if count:
+        Log.info(f"Restored {count} presets from {path} to the preferences")
+
+
+def update_preset_store_path(self, context):
+    if self.use_preset_store:
+        migrate_collection(self)
+
+
+def update_pinned(self, context):
+    store = get_store(prefs(context))
+    if store is not None and is_stored(store, self):
+        store.set_pinned(self.stored_name, self.pinned)
+
+
+def update_working_set_size(self, context):
+    trim_working_set(self)
+
+
+def update_name(self, context):
+    if not (self.stored_name or self.sync_id):
+        return
+    pr = prefs(context)
+    if self.stored_name and self.stored_name != self.name:
+        store = get_store(pr)
+        if store is not None and is_stored(store, self):
+            try:
+                store.rename(self.stored_name, self.name)
+            except sqlite3.IntegrityError:
+                Log.warn(f"A preset named '{self.name}' already exists in the library")
+                self.name = self.stored_name
+                return
+        self.stored_name = self.name
+    if self.sync_id and change_listener is not None:
+        # Sync records are keyed by id; a rename is a save under the new name.
+        change_listener.saved(pr, self)
+
+
+# Blender needs the enum strings to stay referenced while the popup is open.
+_search_items = []
+
+
+def _search_preset_items(self, context):
+    """The whole library; tags are part of the label, so typing a tag
+    in the search popup finds the presets carrying it."""
+    store = get_store(prefs(context))
+    catalog = store.catalog() if store is not None else []
+    _search_items[:] = [
+        (name, f"{name}  [{', '.join(tags)}]" if tags else name, "")
+        for name, tags in catalog]
+    return _search_items
+
+
+@metrics.instrument_operator
+class BONECOLOR_OT_pull_preset(Operator):
+    """Load a preset from the preset library database"""
+    bl_idname = "bonecolor.pull_preset"
+    bl_label = "Pull Preset from Library"
+    bl_options = {'REGISTER', 'UNDO'}
+    bl_property = "preset"
+
+    preset: EnumProperty(name="Preset", items=_search_preset_items)
+
+    @classmethod
+    def poll(cls, context):
+        return prefs(context).use_preset_store
+
+    def execute(self, context):
+        try:
+            preset = materialize(prefs(context), self.preset)
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to pull bone color preset: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Pulled bone color preset: {preset.name}")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        context.window_manager.invoke_search_popup(self)
+        return {'RUNNING_MODAL'}
+
+
+@metrics.instrument_operator
+class BONECOLOR_OT_tag_preset(Operator):
+    """Set the library tags of the active preset, searchable when pulling presets"""
+    bl_idname = "bonecolor.tag_preset"
+    bl_label = "Tag Preset"
+    bl_options = {'REGISTER'}
+
+    tags: StringProperty(
+        name="Tags",
+        description="Comma separated tags",
+    )
+
+    @classmethod
+    def poll(cls, context):
+        pr = prefs(context)
+        return pr.use_preset_store and 0 <= pr.active_bcs_preset_index < len(pr.bcs_presets)
+
+    def _stored_preset(self, context):
+        pr = prefs(context)
+        preset = pr.bcs_presets[pr.active_bcs_preset_index]
+        store = get_store(pr)
+        if not is_stored(store, preset):
+            raise KeyError(f"Preset '{preset.name}' is not in the library")
+        return store, preset
+
+    def execute(self, context):
+        try:
+            store, preset = self._stored_preset(context)
+            tags = [tag.strip() for tag in self.tags.split(",") if tag.strip()]
+            store.set_tags(preset.stored_name, tags)
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to tag bone color preset: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Tagged bone color preset {preset.name}: {', '.join(tags)}")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        try:
+            store, preset = self._stored_preset(context)
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to tag bone color preset: {e}")
+            return {'CANCELLED'}
+        self.tags = ", ".join(store.get_tags(preset.stored_name))
+        return context.window_manager.invoke_props_dialog(self)
+
+
+@metrics.instrument_operator
+class BONECOLOR_OT_migrate_presets(Operator):
+    """Copy all presets stored in the preferences into the preset library database"""
+    bl_idname = "bonecolor.migrate_presets"
+    bl_label = "Migrate Presets to Library"
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        return prefs(context).use_preset_store
+
+    def execute(self, context):
+        try:
+            count = migrate_collection(prefs(context))
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to migrate bone color presets: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Migrated {count} bone color presets")
+        return {'FINISHED'}
+
+
+def draw_library(layout, pr):
+    row = layout.row(align=True)
+    row.prop(pr, "use_preset_store", toggle=True, icon='ASSET_MANAGER')
+    if pr.use_preset_store:
+        row.prop(pr, "preset_working_set_size", text="Keep")
+        row.operator("bonecolor.pull_preset", text="", icon='VIEWZOOM')
+        row.operator("bonecolor.tag_preset", text="", icon='BOOKMARKS')
+        row.operator("bonecolor.migrate_presets", text="", icon='FILE_REFRESH')
+
+
+classes = (
+    BONECOLOR_OT_pull_preset,
+    BONECOLOR_OT_tag_preset,
+    BONECOLOR_OT_migrate_presets,
+)
+
+_register, _unregister = bpy.utils.register_classes_factory(classes)
+
+
+def register():
+    _register()
+
+
+def unregister():
+    close_store()
+    _unregister()
@@ -0,0 +1,213 @@
+"""Preset file schema and codec.
+
+Has no ``bpy`` dependency so it can be used by ``preset_cli.py`` in CI
+or on render nodes as well as by the addon operators.
+"""
+import ast
+import copy
+import functools
+import hashlib
+import json
+import os
+
+
+ADDON_PATH = os.path.normpath(os.path.dirname(os.path.abspath(__file__)))
+# 'addon' field written to and required of preset files by both the
+# operators and the CLI, independent of the folder the addon is
+# installed in (e.g. "bone_color_presets-main" from a zip).
+RELEASE_ADDON_ID = "bone_color_presets"
+
+COLOR_KEYS = ("normal", "select", "active")
+COLOR_SET_DEFAULTS = {
+    "show_colored_constraints": False,
+}
+
+
+class PresetError(ValueError):
+    """Raised for preset data that does not match the schema."""
+
+
+def format_version(version):
+    return ".".join(str(v) for v in version)
+
+
+def parse_version(text):
+    try:
+        return tuple(int(v) for v in str(text).split("."))
+    except ValueError:
+        raise PresetError(f"Invalid version: {text!r}") from None
+
+
+@functools.lru_cache(maxsize=None)
+def read_addon_version(path=ADDON_PATH):
+    """Read ``bl_info["version"]`` from the addon's __init__.py without importing it."""
+    with open(os.path.join(path, "__init__.py"), 'r') as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+                isinstance(t, ast.Name) and t.id == "bl_info" for t in node.targets):
+            return tuple(ast.literal_eval(node.value)["version"])
+    raise PresetError("bl_info not found")
+
+
+def _color(value, key, index):
+    if not isinstance(value, (list, tuple)) or len(value) != 3:
+        raise PresetError(f"Color set {index}: '{key}' must be a list of 3 numbers")
+    try:
+        color = [float(v) for v in value]
+    except (TypeError, ValueError):
+        raise PresetError(f"Color set {index}: '{key}' must be a list of 3 numbers") from None
+    return [min(1.0, max(0.0, v)) for v in color]
+
+
+def normalize_color_set(data, index=0):
+    """Validate one color set dict and fill in optional fields."""
+    if not isinstance(data, dict):
+        raise PresetError(f"Color set {index}: expected an object")
+    missing = [key for key in COLOR_KEYS if key not in data]
+    if missing:
+        raise PresetError(f"Color set {index}: missing {', '.join(missing)}")
+    color_set = {key: _color(data[key], key, index) for key in COLOR_KEYS}
+    for key, default in COLOR_SET_DEFAULTS.items():
+        color_set[key] = type(default)(data.get(key, default))
+    return color_set
+
+
+def encode_preset(name, color_sets, version, addon_id=RELEASE_ADDON_ID):
+    """Build the exported file structure for one preset."""
+    return {
+        "addon": addon_id,
+        "version": format_version(version),
+        "name": name,
+        "presets": [normalize_color_set(cs, i) for i, cs in enumerate(color_sets)],
+    }
+
+
+def decode_preset(data, addon_id=RELEASE_ADDON_ID):
+    """Validate a loaded preset file; returns (name, color_sets)."""
+    if not isinstance(data, dict):
+        raise PresetError("Expected a preset object")
+    if data.get("addon") != addon_id:
+        raise PresetError(f"Not a {addon_id} preset (addon: {data.get('addon')!r})")
+    if "version" not in data:
+        raise PresetError("Missing preset version")
+    parse_version(data["version"])
+    name = data.get("name")
+    if not isinstance(name, str) or not name:
+        raise PresetError("Missing preset name")
+    color_sets = data.get("presets")
+    if not isinstance(color_sets, list):
+        raise PresetError("'presets' must be a list of color sets")
+    return name, [normalize_color_set(cs, i) for i, cs in enumerate(color_sets)]
+
+
+def preset_hash(color_sets):
+    """Content hash of normalized color sets, independent of name and version."""
+    canonical = json.dumps(
+        [[cs[key] for key in COLOR_KEYS] + [cs["show_colored_constraints"]] for cs in color_sets],
+        separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def load_file(filepath):
+    with open(filepath, 'r', encoding="utf-8") as f:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError as e:
+            raise PresetError(f"Invalid JSON: {e}") from None
+        except UnicodeDecodeError as e:
+            raise PresetError(f"Not a UTF-8 text file: {e}") from None
+
+
+def dump_file(filepath, data, indent=4):
+    with open(filepath, 'w') as f:
+        json.dump(data, f, indent=indent)
+
+
+# --- Migrations ---
+
+# Version assumed for files that predate the version field.
+LEGACY_VERSION = (0, 0, 0)
+
+# (introduced_in, step) pairs; a step upgrades data written by any
+# version older than ``introduced_in``.
+_MIGRATIONS = []
+
+
+def migration(introduced_in):
+    """Register a step upgrading data older than ``introduced_in``.
+
+    Steps receive the file data and a context dict (``name``,
+    ``addon_id``) and return the upgraded data.
+    """
+    def decorator(func):
+        _MIGRATIONS.append((tuple(introduced_in), func))
+        _MIGRATIONS.sort(key=lambda item: item[0])
+        compile_chain.cache_clear()
+        return func
+    return decorator
+
+
+def source_version(data):
+    """Version string a file was written with."""
+    if isinstance(data, dict) and "version" in data:
+        return str(data["version"])
+    return format_version(LEGACY_VERSION)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_chain(version, target):
+    """Steps upgrading ``version`` (a string) to ``target`` (a tuple).
+
+    Cached per source version, so a batch of files only parses and
+    dispatches each distinct version once.
+    """
+    source = parse_version(version)
+    return tuple(step for introduced_in, step in _MIGRATIONS if source < introduced_in <= target)
+
+
+def upgrade(data, name="", addon_id=RELEASE_ADDON_ID, target=None):
+    """Return ``data`` upgraded to ``target`` (default: the addon version).
+
+    Files newer than ``target`` are returned unchanged. Raises
+    PresetError for data that is neither an object nor a legacy list.
+    """
+    if not isinstance(data, (dict, list)):
+        raise PresetError(f"Expected a preset object, got {type(data).__name__}")
+    target = tuple(target) if target is not None else read_addon_version()
+    version = source_version(data)
+    chain = compile_chain(version, target)
+    if not chain:
+        return data
+    context = {"name": name, "addon_id": addon_id}
+    data = copy.deepcopy(data)
+    for step in chain:
+        data = step(data, context)
+    data["version"] = format_version(target)
+    return data
+
+
+def upgrade_many(items, addon_id=RELEASE_ADDON_ID, target=None):
+    """Upgrade (data, name) pairs of mixed versions in a single pass."""
+    target = tuple(target) if target is not None else read_addon_version()
+    return [upgrade(data, name, addon_id, target) for data, name in items]
+
+
+@migration((0, 0, 1))
+def _wrap_legacy_list(data, context):
+    """Bare lists of color sets written by BCSPresets.save_to_file."""
+    if isinstance(data, list):
+        return {"addon": context["addon_id"], "name": context["name"], "presets": data}
+    return data
+
+
+@migration((0, 0, 3))
+def _fill_missing_fields(data, context):
+    """Older exports could lack the preset name and constraint toggle."""
+    if not data.get("name"):
+        data["name"] = context["name"] or "Imported Preset"
+    for color_set in data.get("presets", ()):
+        if isinstance(color_set, dict):
+            for key, default in COLOR_SET_DEFAULTS.items():
+                color_set.setdefault(key, default)
+    return data
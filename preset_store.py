@@ -0,0 +1,194 @@
+"""SQLite-backed preset library.
+
+Holds any number of presets outside userpref.blend so the library can
+be shared between Blender versions. Color sets are stored as the same
+normalized JSON used by preset files (see ``preset_schema``).
+"""
+import json
+import os
+import sqlite3
+from time import time
+
+from . preset_schema import format_version, normalize_color_set, preset_hash
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS presets (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    hash TEXT NOT NULL,
+    version TEXT NOT NULL,
+    data TEXT NOT NULL,
+    pinned INTEGER NOT NULL DEFAULT 0,
+    last_used REAL NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    sync_id TEXT
+);
+CREATE INDEX IF NOT EXISTS presets_hash ON presets(hash);
+CREATE INDEX IF NOT EXISTS presets_last_used ON presets(pinned, last_used);
+CREATE TABLE IF NOT EXISTS tags (
+    preset_id INTEGER NOT NULL REFERENCES presets(id) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (tag, preset_id)
+);
+"""
+
+
+def _escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class PresetStore:
+    """Preset library in a single SQLite file, keyed by unique name."""
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        directory = os.path.dirname(filepath)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.db = sqlite3.connect(filepath)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.executescript(SCHEMA)
+        columns = {r[1] for r in self.db.execute("PRAGMA table_info(presets)")}
+        if "sync_id" not in columns:
+            # Library files written before presets had sync ids.
+            self.db.execute("ALTER TABLE presets ADD COLUMN sync_id TEXT")
+        self.db.execute("CREATE INDEX IF NOT EXISTS presets_sync_id ON presets(sync_id)")
+
+    def close(self):
+        self.db.close()
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM presets").fetchone()[0]
+
+    def __contains__(self, name):
+        return self.db.execute(
+            "SELECT 1 FROM presets WHERE name = ?", (name,)).fetchone() is not None
+
+    def names(self, prefix=""):
+        """Set of the stored names starting with ``prefix``."""
+        return {r[0] for r in self.db.execute(
+            "SELECT name FROM presets WHERE name LIKE ? ESCAPE '\\'", (f"{_escape_like(prefix)}%",))}
+
+    def _put(self, name, color_sets, version, now, touch=True, sync_id=None):
+        color_sets = [normalize_color_set(cs, i) for i, cs in enumerate(color_sets)]
+        self.db.execute(
+            "INSERT INTO presets (name, hash, version, data, last_used, created, sync_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET hash = excluded.hash, version = excluded.version, "
+            "data = excluded.data, sync_id = COALESCE(excluded.sync_id, sync_id)"
+            + (", last_used = excluded.last_used" if touch else ""),
+            (name, preset_hash(color_sets), format_version(version),
+             json.dumps(color_sets), now, now, sync_id))
+
+    def put(self, name, color_sets, version, touch=True, sync_id=None):
+        """Insert or replace a preset; ``touch`` marks it as just used."""
+        with self.db:
+            self._put(name, color_sets, version, time(), touch, sync_id)
+
+    def put_many(self, presets, version):
+        """Insert (name, color_sets, sync_id) tuples in a single transaction."""
+        now = time()
+        with self.db:
+            for i, (name, color_sets, sync_id) in enumerate(presets):
+                # Keep the original order recognisable in last_used.
+                self._put(name, color_sets, version, now - len(presets) + i, sync_id=sync_id)
+
+    def get(self, name, touch=True):
+        """Return the color sets of ``name`` or None."""
+        row = self.db.execute("SELECT data FROM presets WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        if touch:
+            self.touch(name)
+        return json.loads(row[0])
+
+    def get_sync_id(self, name):
+        row = self.db.execute("SELECT sync_id FROM presets WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def set_sync_id(self, name, sync_id):
+        with self.db:
+            self.db.execute("UPDATE presets SET sync_id = ? WHERE name = ?", (sync_id, name))
+
+    def find_sync_id(self, sync_id):
+        """Name of the preset with ``sync_id`` or None."""
+        row = self.db.execute("SELECT name FROM presets WHERE sync_id = ?", (sync_id,)).fetchone()
+        return row[0] if row else None
+
+    def items(self):
+        """(name, sync_id, color_sets) of every preset."""
+        return [(r[0], r[1], json.loads(r[2])) for r in self.db.execute(
+            "SELECT name, sync_id, data FROM presets ORDER BY last_used")]
+
+    def is_pinned(self, name):
+        row = self.db.execute("SELECT pinned FROM presets WHERE name = ?", (name,)).fetchone()
+        return bool(row and row[0])
+
+    def touch(self, name):
+        with self.db:
+            self.db.execute("UPDATE presets SET last_used = ? WHERE name = ?", (time(), name))
+
+    def remove(self, name):
+        with self.db:
+            self.db.execute("DELETE FROM presets WHERE name = ?", (name,))
+
+    def rename(self, old_name, new_name):
+        with self.db:
+            self.db.execute("UPDATE presets SET name = ? WHERE name = ?", (new_name, old_name))
+
+    def set_pinned(self, name, pinned):
+        with self.db:
+            self.db.execute("UPDATE presets SET pinned = ? WHERE name = ?", (int(pinned), name))
+
+    def set_tags(self, name, tags):
+        with self.db:
+            row = self.db.execute("SELECT id FROM presets WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                raise KeyError(name)
+            self.db.execute("DELETE FROM tags WHERE preset_id = ?", row)
+            self.db.executemany(
+                "INSERT INTO tags (preset_id, tag) VALUES (?, ?)",
+                [(row[0], tag) for tag in sorted(set(tags))])
+
+    def get_tags(self, name):
+        return [r[0] for r in self.db.execute(
+            "SELECT t.tag FROM tags t JOIN presets p ON p.id = t.preset_id "
+            "WHERE p.name = ? ORDER BY t.tag", (name,))]
+
+    def find_by_hash(self, hash):
+        return [r[0] for r in self.db.execute(
+            "SELECT name FROM presets WHERE hash = ? ORDER BY name", (hash,))]
+
+    def find_same(self, color_sets):
+        """Names of the presets holding exactly these color sets."""
+        color_sets = [normalize_color_set(cs, i) for i, cs in enumerate(color_sets)]
+        return self.find_by_hash(preset_hash(color_sets))
+
+    def search(self, text="", tag=None, limit=100):
+        """Names matching ``text`` (and ``tag``), most recently used first."""
+        query = "SELECT p.name FROM presets p"
+        params = []
+        if tag:
+            query += " JOIN tags t ON t.preset_id = p.id AND t.tag = ?"
+            params.append(tag)
+        query += " WHERE p.name LIKE ? ESCAPE '\\' ORDER BY p.last_used DESC LIMIT ?"
+        params += [f"%{_escape_like(text)}%", limit]
+        return [r[0] for r in self.db.execute(query, params)]
+
+    def catalog(self):
+        """(name, tags) of every preset, most recently used first."""
+        return [(r[0], r[1].split("\n") if r[1] else []) for r in self.db.execute(
+            "SELECT p.name, GROUP_CONCAT(t.tag, char(10)) FROM presets p "
+            "LEFT JOIN tags t ON t.preset_id = p.id "
+            "GROUP BY p.id ORDER BY p.last_used DESC")]
+
+    def working_set(self, size):
+        """Names that should stay materialized: pinned ones plus the
+        ``size`` most recently used."""
+        return [r[0] for r in self.db.execute(
+            "SELECT name FROM presets WHERE pinned = 1 "
+            "UNION ALL "
+            "SELECT name FROM (SELECT name FROM presets WHERE pinned = 0 "
+            "ORDER BY last_used DESC LIMIT ?)", (size,))]
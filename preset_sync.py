@@ -0,0 +1,286 @@
+import bpy
+
+import os
+import numpy as np
+
+from . addon import prefs, ADDON_VERSION, USER_DATA_PATH
+from . change_log import ChangeLog, fold
+from . debug_utils import Log, DBG_PREFS
+from . import preset_library
+from . preset_library import get_store, is_stored, new_sync_id, trim_working_set, unique_name
+
+
+DEFAULT_SYNC_DIR = os.path.join(USER_DATA_PATH, "sync")
+
+_log = None
+# Set while remote changes are applied so they are not published again.
+_applying = False
+
+
+def sync_directory(pr):
+    return bpy.path.abspath(pr.sync_directory) if pr.sync_directory else DEFAULT_SYNC_DIR
+
+
+def get_log(pr):
+    """The shared ChangeLog, or None when syncing is off."""
+    global _log
+    if not pr.use_sync:
+        return None
+    directory = sync_directory(pr)
+    if _log is None or _log.directory != directory:
+        _log = ChangeLog(directory)
+    return _log
+
+
+def _encode(normal, select, active, show_colored_constraints):
+    return [round(v, 6) for v in (*normal, *select, *active)] + [int(show_colored_constraints)]
+
+
+def encode_color_sets(preset):
+    """Compact record payload: one flat list of 10 values per color set."""
+    return [
+        _encode(cs.normal, cs.select, cs.active, cs.show_colored_constraints)
+        for cs in preset.color_sets
+    ]
+
+
+def encode_stored_sets(color_sets):
+    """Same payload from color sets as held by the preset library."""
+    return [
+        _encode(cs["normal"], cs["select"], cs["active"], cs["show_colored_constraints"])
+        for cs in color_sets
+    ]
+
+
+def decode_color_sets(sets):
+    return [
+        {
+            "normal": values[0:3],
+            "select": values[3:6],
+            "active": values[6:9],
+            "show_colored_constraints": bool(values[9]),
+        }
+        for values in sets
+    ]
+
+
+def _publish(pr, op, sync_id, **fields):
+    if _applying:
+        return
+    log = get_log(pr)
+    if log is None:
+        return
+    try:
+        log.append(op, sync_id, **fields)
+    except OSError as e:
+        Log.error(f"Failed to write preset sync log: {e}")
+
+
+class SyncPublisher:
+    """preset_library change listener appending records to the log."""
+
+    def saved(self, pr, preset):
+        _publish(pr, "save", preset.sync_id, name=preset.name, sets=encode_color_sets(preset))
+
+    def removed(self, pr, sync_id):
+        _publish(pr, "remove", sync_id)
+
+
+def publish_local(pr):
+    """Publish the presets the log does not know yet, such as the ones
+    saved while syncing was off or with another sync folder.
+
+    Their ids are new to the log, so records of other instances never
+    overwrite them, whatever their names. Returns the number published.
+    """
+    log = get_log(pr)
+    if log is None:
+        return 0
+    store = get_store(pr)
+    known = {record["id"] for record in log.read_all()}
+    seen = set()
+    records = []
+    for preset in pr.bcs_presets:
+        if not preset.sync_id:
+            preset.sync_id = new_sync_id()
+            if store is not None and is_stored(store, preset):
+                store.set_sync_id(preset.stored_name, preset.sync_id)
+        seen.add(preset.sync_id)
+        if preset.sync_id not in known:
+            records.append(log.record(
+                "save", preset.sync_id, name=preset.name, sets=encode_color_sets(preset)))
+    if store is not None:
+        for name, sync_id, color_sets in store.items():
+            if sync_id in seen:
+                continue
+            if not sync_id:
+                sync_id = new_sync_id()
+                store.set_sync_id(name, sync_id)
+            if sync_id not in known:
+                records.append(log.record(
+                    "save", sync_id, name=name, sets=encode_stored_sets(color_sets)))
+    if records:
+        log.append_many(records)
+    DBG_PREFS and Log.info(f"Published {len(records)} local presets for syncing")
+    return len(records)
+
+
+def _replace_color_sets(preset, sets):
+    values = np.asarray(sets, dtype=np.float32).reshape(-1, 10)
+    preset.color_sets.clear()
+    preset.set_from_array(values[:, :9].reshape(-1, 3, 3), [bool(v) for v in values[:, 9]])
+
+
+def _index_by_id(presets):
+    return {p.sync_id: i for i, p in enumerate(presets) if p.sync_id}
+
+
+def _apply_save(pr, store, index, record):
+    presets = pr.bcs_presets
+    sync_id = record["id"]
+    name = record["name"]
+    if store is not None:
+        # Library names are unique, so a remote name already used by
+        # another preset gets a suffix in this instance.
+        stored_name = store.find_sync_id(sync_id)
+        taken = store.names(name)
+        taken.discard(stored_name)
+        name = unique_name(name, taken)
+        if stored_name is not None and stored_name != name:
+            # Keeps the pinned flag and tags of the renamed preset.
+            store.rename(stored_name, name)
+
+    i = index.get(sync_id, -1)
+    if i < 0 and store is None:
+        presets.add().sync_id = sync_id
+        i = index[sync_id] = len(presets) - 1
+    if i >= 0:
+        preset = presets[i]
+        if store is not None:
+            # Key first, so update_name sees nothing to rename.
+            preset.stored_name = name
+        preset.name = name
+        _replace_color_sets(preset, record["sets"])
+        color_sets = [cs.as_dict() for cs in preset.color_sets]
+    else:
+        color_sets = decode_color_sets(record["sets"])
+    if store is not None:
+        store.put(name, color_sets, ADDON_VERSION, touch=False, sync_id=sync_id)
+
+
+def _apply_remove(pr, store, index, record):
+    sync_id = record["id"]
+    if store is not None:
+        stored_name = store.find_sync_id(sync_id)
+        if stored_name is not None:
+            store.remove(stored_name)
+    i = index.get(sync_id, -1)
+    if i < 0:
+        return
+    presets = pr.bcs_presets
+    presets.remove(i)
+    index.clear()
+    index.update(_index_by_id(presets))
+    if pr.active_bcs_preset_index > i or pr.active_bcs_preset_index >= len(presets):
+        pr.active_bcs_preset_index -= 1
+
+
+def apply_record(pr, record, index=None):
+    """Apply one log record to the preferences (and the preset library).
+
+    Records are matched to presets by id only. Every record sets the
+    final state of its preset, so a change made here first and replayed
+    from the log later is harmless, and all instances converge on the
+    log order. ``index`` maps sync ids to collection indices.
+    """
+    store = get_store(pr)
+    if index is None:
+        index = _index_by_id(pr.bcs_presets)
+    if record["op"] == "save":
+        _apply_save(pr, store, index, record)
+    elif record["op"] == "remove":
+        _apply_remove(pr, store, index, record)
+
+
+def apply_changes(pr):
+    """Apply records appended since the last call; returns their count."""
+    global _applying
+    log = get_log(pr)
+    if log is None:
+        return 0
+    records = log.read_new()
+    if not records:
+        return 0
+    _applying = True
+    try:
+        index = _index_by_id(pr.bcs_presets)
+        # Only the last record per id matters; skip the ones it overwrites.
+        for record in fold(records, tombstone_ttl=float("inf")):
+            apply_record(pr, record, index)
+        trim_working_set(pr)
+    finally:
+        _applying = False
+    DBG_PREFS and Log.info(f"Applied {len(records)} preset sync records")
+    return len(records)
+
+
+def _poll_changes():
+    try:
+        pr = prefs(bpy.context)
+    except (AttributeError, KeyError):
+        return None
+    if not pr.use_sync:
+        return None
+    try:
+        if apply_changes(pr):
+            for window in bpy.context.window_manager.windows:
+                for area in window.screen.areas:
+                    area.tag_redraw()
+    except Exception as e:
+        Log.error(f"Failed to apply preset sync records: {e}")
+    return pr.sync_interval
+
+
+def start_sync(pr):
+    if pr.use_sync and not bpy.app.timers.is_registered(_poll_changes):
+        bpy.app.timers.register(_poll_changes, first_interval=0.0, persistent=True)
+
+
+def stop_sync():
+    global _log
+    if bpy.app.timers.is_registered(_poll_changes):
+        bpy.app.timers.unregister(_poll_changes)
+    _log = None
+
+
+def join_sync(pr):
+    """Catch up with the log, then publish the presets it lacks."""
+    try:
+        apply_changes(pr)
+        publish_local(pr)
+    except (OSError, ValueError) as e:
+        Log.error(f"Failed to join preset sync: {e}")
+    start_sync(pr)
+
+
+def update_use_sync(self, context):
+    if self.use_sync:
+        join_sync(self)
+    else:
+        stop_sync()
+
+
+def draw_sync(layout, pr):
+    row = layout.row(align=True)
+    row.prop(pr, "use_sync", toggle=True, icon='UV_SYNC_SELECT')
+    if pr.use_sync:
+        row.prop(pr, "sync_directory", text="")
+
+
+def register():
+    preset_library.change_listener = SyncPublisher()
+
+
+def unregister():
+    preset_library.change_listener = None
+    stop_sync()
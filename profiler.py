@@ -0,0 +1,193 @@
+import functools
+import itertools
+import json
+import os
+import threading
+from collections import deque
+from time import perf_counter
+
+from . debug_utils import Log
+
+
+class SpanStats:
+    """Aggregated timings for all spans sharing a name."""
+    __slots__ = ("count", "total", "min", "max", "samples")
+
+    def __init__(self, max_samples):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        # Recent durations, used for the percentiles.
+        self.samples = deque(maxlen=max_samples)
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        if duration < self.min:
+            self.min = duration
+        if duration > self.max:
+            self.max = duration
+        self.samples.append(duration)
+
+    @staticmethod
+    def _percentile(ordered, pct):
+        if not ordered:
+            return 0.0
+        index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+        return ordered[index]
+
+    def as_dict(self):
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "p50": self._percentile(ordered, 50),
+            "p95": self._percentile(ordered, 95),
+        }
+
+
+class _NullSpan:
+    """Returned by Profiler.span while profiling is disabled."""
+    __slots__ = ()
+    span_id = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "span_id", "parent_id", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.span_id = None
+        self.parent_id = None
+        self.start = 0.0
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        self.parent_id = stack[-1].span_id if stack else None
+        self.span_id = next(self.profiler._ids)
+        stack.append(self)
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = perf_counter()
+        stack = self.profiler._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        self.profiler._record(self, end)
+        return False
+
+
+class Profiler:
+    """Hierarchical span profiler.
+
+    Spans nest per thread and are aggregated by name. Completed spans
+    are also kept as trace events that can be exported for
+    chrome://tracing or Perfetto.
+    """
+
+    def __init__(self, max_samples=4096, max_events=100000):
+        self.enabled = False
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._ids = itertools.count(1)
+        self._stats = {}
+        self._events = deque(maxlen=max_events)
+        self._origin = perf_counter()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, span, end):
+        duration = end - span.start
+        event = {
+            "name": span.name,
+            "ph": "X",
+            "ts": (span.start - self._origin) * 1e6,
+            "dur": duration * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {"id": span.span_id, "parent": span.parent_id},
+        }
+        with self._lock:
+            stats = self._stats.get(span.name)
+            if stats is None:
+                stats = self._stats[span.name] = SpanStats(self.max_samples)
+            stats.add(duration)
+            self._events.append(event)
+
+    def span(self, name):
+        """Context manager timing the enclosed block as ``name``."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def profile(self, name=None):
+        """Decorator timing each call of the wrapped function."""
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def current_span_id(self):
+        """Id of the innermost open span on this thread, if any."""
+        stack = getattr(self._local, "stack", None)
+        return stack[-1].span_id if stack else None
+
+    def stats(self):
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._events.clear()
+            self._origin = perf_counter()
+
+    def export_chrome_trace(self, filepath):
+        """Write all recorded spans as Chrome trace-event JSON."""
+        with self._lock:
+            events = list(self._events)
+        with open(filepath, 'w') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(events)
+
+    def report(self):
+        """Print the aggregated statistics, slowest total first."""
+        stats = self.stats()
+        Log.header(title="PROFILE")
+        for name, s in sorted(stats.items(), key=lambda item: item[1]["total"], reverse=True):
+            Log.color_print(
+                Log._style.BLUE,
+                f"{name}: n={s['count']} total={s['total'] * 1e3:.3f}ms "
+                f"min={s['min'] * 1e3:.3f}ms p50={s['p50'] * 1e3:.3f}ms "
+                f"p95={s['p95'] * 1e3:.3f}ms max={s['max'] * 1e3:.3f}ms")
+        Log.footer()
+
+
+profiler = Profiler()
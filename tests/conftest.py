@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+# The addon package itself imports bpy; pytest imports it as the parent
+# package of these tests, so install the benchmark fake first.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+import fake_bpy  # noqa: E402
+
+fake_bpy.install()
+
+
+@pytest.fixture(scope="session")
+def addon():
+    """The addon registered on top of fake_bpy, with its modules by name."""
+    from run_benchmarks import load_addon
+    bpy, package = load_addon()
+    return bpy, {name: sys.modules[f"{package.__name__}.{name}"] for name in (
+        "addon", "bone_color_sets", "change_log", "preset_library", "preset_store", "preset_sync")}
+
+
+@pytest.fixture
+def env(addon, tmp_path):
+    """Empty preferences with the library and syncing off, pointed at
+    ``tmp_path``."""
+    bpy, modules = addon
+    context = bpy.context
+    pr = modules["addon"].prefs(context)
+    pr.use_sync = False
+    pr.use_preset_store = False
+    pr.bcs_presets.clear()
+    pr.preset_working_set_size = 5
+    pr.preset_store_path = str(tmp_path / "library.sqlite")
+    pr.sync_directory = str(tmp_path / "sync")
+    yield context, pr, modules
+    pr.use_sync = False
+    pr.use_preset_store = False
+    pr.bcs_presets.clear()
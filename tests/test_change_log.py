@@ -0,0 +1,99 @@
+"""Behavior checks for the shared preset change log.
+
+change_log has no bpy dependency, so these run with plain pytest:
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import change_log  # noqa: E402
+from change_log import ChangeLog, fold  # noqa: E402
+
+
+def save(id, name, ts=0.0, value=0.0):
+    return {"op": "save", "id": id, "name": name, "sets": [[value] * 9 + [0]], "origin": "test", "ts": ts}
+
+
+def remove(id, ts=0.0):
+    return {"op": "remove", "id": id, "origin": "test", "ts": ts}
+
+
+def test_fold_keeps_the_last_record_per_id():
+    records = [save("a", "Preset 1", value=0.1), save("b", "Preset 1", value=0.2),
+               save("a", "Renamed", value=0.3)]
+    folded = fold(records, now=0.0)
+    assert [(r["id"], r["name"]) for r in folded] == [("b", "Preset 1"), ("a", "Renamed")]
+    assert folded[1]["sets"][0][0] == 0.3
+
+
+def test_fold_keeps_presets_that_share_a_name():
+    records = [save("a", "Preset 1"), save("b", "Preset 1"), remove("a")]
+    assert [(r["op"], r["id"]) for r in fold(records, now=0.0)] == [("save", "b"), ("remove", "a")]
+
+
+def test_fold_drops_old_tombstones():
+    records = [save("a", "A", ts=0.0), remove("a", ts=10.0), remove("b", ts=95.0)]
+    assert [r["id"] for r in fold(records, now=100.0, tombstone_ttl=50.0)] == ["b"]
+
+
+def test_read_new_returns_each_record_once(tmp_path):
+    writer = ChangeLog(str(tmp_path), origin="writer")
+    reader = ChangeLog(str(tmp_path), origin="reader")
+    writer.append("save", "a", name="A", sets=[])
+    writer.append_many([writer.record("save", "b", name="B", sets=[]),
+                        writer.record("remove", "a")])
+
+    assert [(r["op"], r["id"], r["origin"]) for r in reader.read_new()] == [
+        ("save", "a", "writer"), ("save", "b", "writer"), ("remove", "a", "writer")]
+    assert reader.read_new() == []
+    assert len(reader.read_all()) == 3
+
+
+def test_read_new_waits_for_complete_lines(tmp_path):
+    log = ChangeLog(str(tmp_path))
+    log.append("save", "a", name="A", sets=[])
+    reader = ChangeLog(str(tmp_path))
+    assert len(reader.read_new()) == 1
+
+    with open(log.path, "ab") as f:
+        f.write(b'{"op":"remove","id":"a",')
+    assert reader.read_new() == []
+    with open(log.path, "ab") as f:
+        f.write(b'"origin":"x","ts":0}\n')
+    assert [r["op"] for r in reader.read_new()] == ["remove"]
+
+
+def test_reader_replays_compacted_log(tmp_path):
+    writer = ChangeLog(str(tmp_path), max_bytes=2000)
+    reader = ChangeLog(str(tmp_path))
+    history = []
+    seen = []
+    generations = set()
+    for i in range(200):
+        record = writer.append("save", f"id{i % 7}", name="Preset 1", sets=[[i] * 9 + [0]])
+        history.append(record)
+        if i % 13 == 0:
+            history.append(writer.append("remove", f"id{i % 5}"))
+        if i % 17 == 0:
+            seen += reader.read_new()
+            generations.add(reader.generation)
+    seen += reader.read_new()
+
+    assert len(generations) > 1, "the log was never compacted"
+    assert os.path.getsize(writer.path) < 4000
+    assert fold(seen) == fold(history)
+    assert fold(writer.read_all()) == fold(history)
+
+
+def test_compaction_keeps_records_of_every_origin(tmp_path):
+    first = ChangeLog(str(tmp_path), origin="first", max_bytes=500)
+    second = ChangeLog(str(tmp_path), origin="second", max_bytes=500)
+    for i in range(20):
+        first.append("save", f"first{i % 3}", name="Preset 1", sets=[])
+        second.append("save", f"second{i % 3}", name="Preset 1", sets=[])
+    first.compact()
+    assert sorted(r["id"] for r in first.read_all()) == [
+        "first0", "first1", "first2", "second0", "second1", "second2"]
+    assert os.path.exists(os.path.join(str(tmp_path), change_log.LOCK_NAME))
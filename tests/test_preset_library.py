@@ -0,0 +1,198 @@
+"""Behavior checks for the SQLite preset library on top of fake_bpy.
+
+    python -m pytest tests
+"""
+import pytest
+
+
+def set_theme(context, value):
+    for theme_set in context.preferences.themes[0].bone_color_sets:
+        theme_set.normal = (value, 0.5, 0.25)
+
+
+def save(context, modules, value=None):
+    if value is not None:
+        set_theme(context, value)
+    op = modules["bone_color_sets"].BONECOLOR_OT_save_preset()
+    assert op.execute(context) == {'FINISHED'}
+    return op
+
+
+def add_local(pr, context, name, value):
+    set_theme(context, value)
+    preset = pr.bcs_presets.add().add_color_sets(context.preferences.themes[0])
+    preset.name = name
+    return preset
+
+
+def names(pr):
+    return [p.name for p in pr.bcs_presets]
+
+
+def test_is_stored_compares_colors(env):
+    context, pr, modules = env
+    library = modules["preset_library"]
+    pr.use_preset_store = True
+    save(context, modules, 0.1)
+    store = library.get_store(pr)
+    preset = pr.bcs_presets[pr.active_bcs_preset_index]
+    assert library.is_stored(store, preset)
+
+    preset.color_sets[0].normal = (0.9, 0.9, 0.9)
+    assert not library.is_stored(store, preset)
+    preset.stored_name = "Missing"
+    assert not library.is_stored(store, preset)
+
+
+def test_is_stored_tolerates_rounded_values(env):
+    context, pr, modules = env
+    library = modules["preset_library"]
+    pr.use_preset_store = True
+    store = library.get_store(pr)
+    preset = add_local(pr, context, "Rounded", 0.6)
+    # As written from a sync record: exact decimals, not single precision.
+    store.put("Rounded", [
+        {"normal": [0.6, 0.5, 0.25], "select": list(cs.select), "active": list(cs.active),
+         "show_colored_constraints": cs.show_colored_constraints}
+        for cs in preset.color_sets], (0, 0, 3))
+    preset.stored_name = "Rounded"
+    assert library.is_stored(store, preset)
+
+
+def test_migration_keeps_unrelated_stored_preset(env):
+    context, pr, modules = env
+    library = modules["preset_library"]
+    store = modules["preset_store"].PresetStore(pr.preset_store_path)
+    other = add_local(pr, context, "Preset 1", 0.9)
+    store.put("Preset 1", [cs.as_dict() for cs in other.color_sets], (0, 0, 3))
+    stored_data = store.get("Preset 1", touch=False)
+    store.close()
+    pr.bcs_presets.clear()
+
+    add_local(pr, context, "Preset 1", 0.1)
+    pr.use_preset_store = True
+    store = library.get_store(pr)
+
+    assert names(pr) == ["Preset 1.001"]
+    assert store.get("Preset 1", touch=False) == stored_data
+    assert library.is_stored(store, pr.bcs_presets[0])
+
+
+def test_migration_gives_same_named_presets_unique_names(env):
+    context, pr, modules = env
+    library = modules["preset_library"]
+    for i in range(30):
+        add_local(pr, context, "Preset 1", i / 30)
+    add_local(pr, context, "Preset 1.002", 0.99)
+    pr.active_bcs_preset_index = 3
+
+    pr.use_preset_store = True
+    store = library.get_store(pr)
+
+    assert len(store) == 31
+    assert "Preset 1.002" in store
+    assert store.get("Preset 1.002", touch=False)[0]["normal"][0] == pytest.approx(0.99)
+    # Trimmed to the working set, the active preset included.
+    assert len(pr.bcs_presets) <= pr.preset_working_set_size + 1
+    # "Preset 1.002" keeps its name, so the fourth one skips it.
+    assert pr.bcs_presets[pr.active_bcs_preset_index].name == "Preset 1.004"
+
+
+def test_disable_restores_every_preset(env):
+    context, pr, modules = env
+    for i in range(12):
+        add_local(pr, context, "Preset 1", i / 12)
+    pr.active_bcs_preset_index = 0
+    pr.use_preset_store = True
+    assert len(pr.bcs_presets) < 12
+
+    pr.use_preset_store = False
+    assert sorted(names(pr)) == sorted(["Preset 1"] + [f"Preset 1.{i:03d}" for i in range(1, 12)])
+
+
+def test_trim_only_drops_stored_presets(env):
+    context, pr, modules = env
+    library = modules["preset_library"]
+    pr.use_preset_store = True
+    pr.preset_working_set_size = 1
+    for i in range(4):
+        save(context, modules, i / 4)
+    # Carries a key, but the store never held it.
+    local = add_local(pr, context, "Local", 0.7)
+    local.stored_name = "Local"
+    pr.active_bcs_preset_index = 0
+    active = pr.bcs_presets[0].name
+
+    library.trim_working_set(pr)
+    recent = library.get_store(pr).working_set(1)
+    assert set(names(pr)) == {active, "Local", *recent}
+
+
+def test_pinned_presets_stay_materialized(env):
+    context, pr, modules = env
+    library = modules["preset_library"]
+    pr.use_preset_store = True
+    pr.preset_working_set_size = 1
+    save(context, modules, 0.1)
+    first = pr.bcs_presets[pr.active_bcs_preset_index].name
+    pr.bcs_presets[pr.active_bcs_preset_index].pinned = True
+    for i in range(3):
+        save(context, modules, 0.2 + i / 10)
+
+    library.trim_working_set(pr)
+    assert first in names(pr)
+
+
+def test_save_reuses_identical_stored_preset(env):
+    context, pr, modules = env
+    library = modules["preset_library"]
+    pr.use_preset_store = True
+    save(context, modules, 0.3)
+    first = pr.bcs_presets[pr.active_bcs_preset_index].name
+    save(context, modules, 0.4)
+
+    op = save(context, modules, 0.3)
+    assert "already in the library" in op.reports[-1][1]
+    assert len(library.get_store(pr)) == 2
+    assert pr.bcs_presets[pr.active_bcs_preset_index].name == first
+    assert names(pr).count(first) == 1
+
+
+def test_rename_leaves_unrelated_stored_preset_alone(env):
+    context, pr, modules = env
+    library = modules["preset_library"]
+    pr.use_preset_store = True
+    save(context, modules, 0.1)
+    store = library.get_store(pr)
+    stored = pr.bcs_presets[pr.active_bcs_preset_index]
+    # Same key, other colors: e.g. the library file was swapped.
+    impostor = add_local(pr, context, "Impostor", 0.8)
+    impostor.stored_name = stored.name
+
+    impostor.name = "Renamed"
+    assert stored.name in store
+    assert "Renamed" not in store
+
+
+def test_name_allocator_skips_taken_suffixes(env):
+    _, _, modules = env
+    allocate = modules["preset_library"]._NameAllocator({"Preset 1", "Preset 1.002"})
+    assert [allocate("Preset 1") for _ in range(3)] == ["Preset 1.001", "Preset 1.003", "Preset 1.004"]
+    assert allocate("Other") == "Other"
+    assert allocate("Other") == "Other.001"
+
+
+def test_tags_are_listed_in_the_pull_menu(env):
+    context, pr, modules = env
+    library = modules["preset_library"]
+    pr.use_preset_store = True
+    save(context, modules, 0.1)
+    name = pr.bcs_presets[pr.active_bcs_preset_index].name
+
+    op = library.BONECOLOR_OT_tag_preset()
+    op.tags = "warm, rig ,, warm"
+    assert op.execute(context) == {'FINISHED'}
+    assert library.get_store(pr).get_tags(name) == ["rig", "warm"]
+
+    items = library._search_preset_items(library.BONECOLOR_OT_pull_preset(), context)
+    assert (name, f"{name}  [rig, warm]", "") in items
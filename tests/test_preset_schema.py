@@ -0,0 +1,94 @@
+"""Behavior checks for the preset migration chain.
+
+preset_schema has no bpy dependency, so these run with plain pytest:
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import preset_schema as schema  # noqa: E402
+
+
+ADDON_ID = "bone_color_presets"
+TARGET = (0, 0, 3)
+
+COLOR_SET = {"normal": [0.1, 0.2, 0.3], "select": [0.4, 0.5, 0.6], "active": [0.7, 0.8, 0.9]}
+
+
+def steps(version, target=TARGET):
+    return [step.__name__ for step in schema.compile_chain(version, target)]
+
+
+def test_compile_chain_selects_steps_by_source_version():
+    assert steps("0.0.0") == ["_wrap_legacy_list", "_fill_missing_fields"]
+    assert steps("0.0.1") == ["_fill_missing_fields"]
+    assert steps("0.0.3") == []
+    assert steps("9.0.0") == []
+    assert steps("0.0.0", target=(0, 0, 1)) == ["_wrap_legacy_list"]
+
+
+def test_compile_chain_rejects_invalid_versions():
+    with pytest.raises(schema.PresetError):
+        schema.compile_chain("not.a.version", TARGET)
+
+
+def test_upgrade_legacy_list():
+    data = schema.upgrade([dict(COLOR_SET)], "Old", ADDON_ID, TARGET)
+    assert data["version"] == "0.0.3"
+    name, color_sets = schema.decode_preset(data, ADDON_ID)
+    assert name == "Old"
+    assert color_sets[0]["show_colored_constraints"] is False
+
+
+def test_upgrade_fills_missing_fields_without_mutating_input():
+    original = {"addon": ADDON_ID, "version": "0.0.2", "presets": [dict(COLOR_SET)]}
+    data = schema.upgrade(original, "From File", ADDON_ID, TARGET)
+    assert data["name"] == "From File"
+    assert data["presets"][0]["show_colored_constraints"] is False
+    assert "name" not in original
+    assert "show_colored_constraints" not in original["presets"][0]
+
+
+def test_upgrade_leaves_current_and_newer_files_alone():
+    current = {"addon": ADDON_ID, "version": "0.0.3", "name": "A", "presets": []}
+    newer = {"addon": ADDON_ID, "version": "1.2.0", "name": "B", "presets": []}
+    assert schema.upgrade(current, "", ADDON_ID, TARGET) is current
+    assert schema.upgrade(newer, "", ADDON_ID, TARGET) is newer
+
+
+@pytest.mark.parametrize("data", ["foo", 42, None, True, 1.5])
+def test_upgrade_rejects_other_json_values(data):
+    with pytest.raises(schema.PresetError):
+        schema.upgrade(data, "Bad", ADDON_ID, TARGET)
+
+
+def test_upgrade_many_mixed_versions():
+    items = [
+        ([dict(COLOR_SET)], "legacy"),
+        ({"addon": ADDON_ID, "version": "0.0.1", "presets": [dict(COLOR_SET)]}, "partial"),
+        ({"addon": ADDON_ID, "version": "0.0.3", "name": "current", "presets": [dict(COLOR_SET)]}, ""),
+        ({"addon": ADDON_ID, "version": "2.0.0", "name": "newer", "presets": [dict(COLOR_SET)]}, ""),
+    ]
+    upgraded = schema.upgrade_many(items, ADDON_ID, TARGET)
+    assert [schema.decode_preset(data, ADDON_ID)[0] for data in upgraded] == [
+        "legacy", "partial", "current", "newer"]
+    assert [data["version"] for data in upgraded] == ["0.0.3", "0.0.3", "0.0.3", "2.0.0"]
+
+
+def test_default_addon_id_matches_release_files():
+    data = schema.encode_preset("Round Trip", [dict(COLOR_SET)], (0, 0, 3))
+    assert data["addon"] == schema.RELEASE_ADDON_ID
+    assert schema.decode_preset(data)[0] == "Round Trip"
+
+
+def test_bundled_presets_are_current():
+    path = os.path.join(schema.ADDON_PATH, "My Presets", "Blender Default.json")
+    data = schema.load_file(path)
+    name, color_sets = schema.decode_preset(schema.upgrade(data, "", schema.RELEASE_ADDON_ID),
+                                            schema.RELEASE_ADDON_ID)
+    assert name == "Blender Default"
+    assert len(color_sets) == 20
@@ -0,0 +1,119 @@
+"""Behavior checks for syncing presets through the change log, on top
+of fake_bpy. The other instance is played by a second ChangeLog
+writing to the same folder.
+
+    python -m pytest tests
+"""
+import pytest
+
+
+def set_theme(context, value):
+    for theme_set in context.preferences.themes[0].bone_color_sets:
+        theme_set.normal = (value, 0.5, 0.25)
+
+
+def save(context, modules, value):
+    set_theme(context, value)
+    assert modules["bone_color_sets"].BONECOLOR_OT_save_preset().execute(context) == {'FINISHED'}
+    pr = modules["addon"].prefs(context)
+    return pr.bcs_presets[pr.active_bcs_preset_index]
+
+
+def other_instance(pr, modules):
+    return modules["change_log"].ChangeLog(pr.sync_directory, origin="other")
+
+
+def remote_save(log, preset_id, name, value):
+    sets = [[value, 0.5, 0.25, 0.1, 0.1, 0.1, 0.2, 0.2, 0.2, 0]] * 20
+    log.append("save", preset_id, name=name, sets=sets)
+
+
+def presets(pr):
+    return {p.sync_id: (p.name, round(p.color_sets[0].normal[0], 4)) for p in pr.bcs_presets}
+
+
+def test_enabling_sync_keeps_local_presets_with_remote_names(env):
+    context, pr, modules = env
+    sync = modules["preset_sync"]
+    local = save(context, modules, 0.1)
+    local_id = local.sync_id
+    log = other_instance(pr, modules)
+    remote_save(log, "remote", local.name, 0.9)
+
+    pr.use_sync = True
+    assert presets(pr) == {local_id: ("Preset 1", 0.1), "remote": ("Preset 1", 0.9)}
+    # The local preset was published under its own id.
+    assert [r["id"] for r in log.read_new() if r["origin"] != "other"] == [local_id]
+
+    log.append("remove", "remote")
+    sync.apply_changes(pr)
+    assert presets(pr) == {local_id: ("Preset 1", 0.1)}
+
+
+def test_same_named_saves_of_two_instances_both_survive(env):
+    context, pr, modules = env
+    sync = modules["preset_sync"]
+    pr.use_sync = True
+    local = save(context, modules, 0.1)
+    log = other_instance(pr, modules)
+    remote_save(log, "remote", local.name, 0.9)
+    remote_save(log, "remote 2", local.name, 0.8)
+
+    sync.apply_changes(pr)
+    assert sorted(presets(pr).values()) == [("Preset 1", 0.1), ("Preset 1", 0.8), ("Preset 1", 0.9)]
+
+
+def test_renames_apply_by_id(env):
+    context, pr, modules = env
+    sync = modules["preset_sync"]
+    pr.use_sync = True
+    first = save(context, modules, 0.1)
+    first_id = first.sync_id
+    second_id = save(context, modules, 0.2).sync_id
+    log = other_instance(pr, modules)
+    log.read_new()
+
+    pr.bcs_presets[1].name = "Renamed"
+    assert [(r["op"], r["id"], r["name"]) for r in log.read_new()] == [("save", second_id, "Renamed")]
+
+    remote_save(log, first_id, "Remote Name", 0.3)
+    sync.apply_changes(pr)
+    assert presets(pr) == {first_id: ("Remote Name", 0.3), second_id: ("Renamed", 0.2)}
+
+
+def test_library_gives_colliding_remote_names_a_suffix(env):
+    context, pr, modules = env
+    sync = modules["preset_sync"]
+    library = modules["preset_library"]
+    pr.use_preset_store = True
+    local = save(context, modules, 0.1)
+    local_id = local.sync_id
+    store = library.get_store(pr)
+    stored_data = store.get("Preset 1", touch=False)
+    log = other_instance(pr, modules)
+    remote_save(log, "remote", "Preset 1", 0.9)
+
+    pr.use_sync = True
+    assert store.get("Preset 1", touch=False) == stored_data
+    assert store.get_sync_id("Preset 1") == local_id
+    assert store.find_sync_id("remote") == "Preset 1.001"
+
+    log.append("remove", "remote")
+    sync.apply_changes(pr)
+    assert store.names() == {"Preset 1"}
+    # Replaying its own record stores the single precision values.
+    assert store.get("Preset 1", touch=False)[0]["normal"] == pytest.approx(stored_data[0]["normal"])
+
+
+def test_enabling_sync_publishes_presets_outside_the_working_set(env):
+    context, pr, modules = env
+    library = modules["preset_library"]
+    pr.use_preset_store = True
+    pr.preset_working_set_size = 1
+    ids = {save(context, modules, i / 10).sync_id for i in range(4)}
+    assert len(pr.bcs_presets) < 4
+
+    pr.use_sync = True
+    log = other_instance(pr, modules)
+    assert {r["id"] for r in log.read_new()} == ids
+    assert {sync_id for _, sync_id, _ in library.get_store(pr).items()} == ids